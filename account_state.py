@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Account State Cache
+This module keeps OANDA account state in memory and refreshes it incrementally with AccountChanges.
+"""
+
+import threading
+import logging
+import oandapyV20.endpoints.accounts as accounts
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = [
+    'balance', 'NAV', 'unrealizedPL', 'pl', 'marginUsed', 'marginAvailable',
+    'positionValue', 'openTradeCount', 'openPositionCount', 'pendingOrderCount'
+]
+
+class AccountState:
+    """In-memory account summary, trades, positions and orders keyed by the last transaction ID"""
+
+    def __init__(self, client, account_id):
+        self.client = client
+        self.account_id = account_id
+        self.last_transaction_id = None
+        self.summary = {}
+        self.trades = {}
+        self.positions = {}
+        self.orders = {}
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        """Bring the cache up to date, loading the full account only on first use or after an error"""
+        with self._lock:
+            if self.last_transaction_id is None:
+                self.load_full()
+                return
+
+            try:
+                self.poll_changes()
+            except Exception as e:
+                logger.warning(f"Account changes poll failed, reloading full account: {e}")
+                self.last_transaction_id = None
+                self.load_full()
+
+    def invalidate(self):
+        """Force a full reload on the next refresh"""
+        with self._lock:
+            self.last_transaction_id = None
+
+    def load_full(self):
+        """Load the complete account with AccountDetails"""
+        r = accounts.AccountDetails(accountID=self.account_id)
+        response = self.client.request(r)
+        account = response['account']
+
+        self.summary = {field: account[field] for field in SUMMARY_FIELDS if field in account}
+        self.summary['currency'] = account.get('currency', 'USD')
+        self.trades = {trade['id']: trade for trade in account.get('trades', [])}
+        self.orders = {order['id']: order for order in account.get('orders', [])}
+        self.positions = {}
+        for position in account.get('positions', []):
+            self._set_position(position)
+
+        self.last_transaction_id = response['lastTransactionID']
+        logger.info(f"Loaded account {self.account_id} at transaction {self.last_transaction_id}")
+
+    def poll_changes(self):
+        """Apply the changes since the last transaction ID seen"""
+        params = {"sinceTransactionID": self.last_transaction_id}
+        r = accounts.AccountChanges(accountID=self.account_id, params=params)
+        response = self.client.request(r)
+
+        self._apply_changes(response.get('changes', {}))
+        self._apply_state(response.get('state', {}))
+        self.last_transaction_id = response['lastTransactionID']
+
+    def get_summary(self):
+        with self._lock:
+            return dict(self.summary)
+
+    def get_trades(self):
+        with self._lock:
+            return [dict(trade) for trade in self.trades.values()]
+
+    def get_positions(self):
+        with self._lock:
+            return [dict(position) for position in self.positions.values()]
+
+    def get_orders(self):
+        with self._lock:
+            return [dict(order) for order in self.orders.values()]
+
+    def _set_position(self, position):
+        if float(position['long']['units']) != 0 or float(position['short']['units']) != 0:
+            self.positions[position['instrument']] = position
+        else:
+            self.positions.pop(position['instrument'], None)
+
+    def _apply_changes(self, changes):
+        for order in changes.get('ordersCreated', []):
+            self.orders[order['id']] = order
+        for key in ('ordersCancelled', 'ordersFilled', 'ordersTriggered'):
+            for order in changes.get(key, []):
+                self.orders.pop(order['id'], None)
+
+        for trade in changes.get('tradesOpened', []) + changes.get('tradesReduced', []):
+            self.trades[trade['id']] = trade
+        for trade in changes.get('tradesClosed', []):
+            self.trades.pop(trade['id'], None)
+
+        for position in changes.get('positions', []):
+            self._set_position(position)
+
+        # The changes state carries neither realized P&L nor counts, so derive them here
+        for transaction in changes.get('transactions', []):
+            if 'accountBalance' in transaction:
+                self.summary['balance'] = transaction['accountBalance']
+            if transaction.get('type') == 'ORDER_FILL' and 'pl' in transaction:
+                self.summary['pl'] = str(float(self.summary.get('pl', 0)) + float(transaction['pl']))
+
+        self.summary['openTradeCount'] = len(self.trades)
+        self.summary['openPositionCount'] = len(self.positions)
+        self.summary['pendingOrderCount'] = len(self.orders)
+
+    def _apply_state(self, state):
+        for field in SUMMARY_FIELDS:
+            if field in state:
+                self.summary[field] = state[field]
+
+        for trade_state in state.get('trades', []):
+            trade = self.trades.get(trade_state['id'])
+            if trade:
+                trade['unrealizedPL'] = trade_state.get('unrealizedPL', trade.get('unrealizedPL'))
+                trade['marginUsed'] = trade_state.get('marginUsed', trade.get('marginUsed'))
+
+        for position_state in state.get('positions', []):
+            position = self.positions.get(position_state['instrument'])
+            if position:
+                position['unrealizedPL'] = position_state.get('netUnrealizedPL', position.get('unrealizedPL'))
+                position['marginUsed'] = position_state.get('marginUsed', position.get('marginUsed'))
+                position['long']['unrealizedPL'] = position_state.get('longUnrealizedPL', position['long'].get('unrealizedPL'))
+                position['short']['unrealizedPL'] = position_state.get('shortUnrealizedPL', position['short'].get('unrealizedPL'))
@@ -3,30 +3,50 @@ from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
 import threading
+import asyncio
 import time
 import logging
 import os
 
 from config import Config
-from models import db, Signal, Trade, Position, Account, Strategy, TradingSettings, UserToken, TradingViewConfig, OANDAConfig
+from models import db, Signal, Trade, Position, SnapshotVersion, Account, Strategy, TradingSettings, UserToken, TradingViewConfig, OANDAConfig, EXTERNAL_SIGNAL_SOURCES
 from discord_fetcher import DiscordSignalFetcher, SimpleSignalFetcher
-from oanda_trader import OANDATrader
+from oanda_trader import OANDATrader, OrderStatusUnknown
+from async_oanda_trader import AsyncOANDATrader
 from strategies import TradingStrategies
+from signal_bus import signal_bus
+from job_scheduler import JobScheduler
+from execution_pool import ExecutionPool
+from instrument_registry import instrument_registry
+from leader_lease import LeaderElector, make_owner_id
+from storage import init_storage
+from persistence_writer import persistence_writer
+from equity_history import EquityHistory, parse_utc
+from candle_store import GRANULARITY_SECONDS
+from signal_claims import SignalClaimer, CLAIMED, SUBMITTED, FILLED, FAILED, EXPIRED
+from signal_freshness import expiry_cutoffs, is_expired, is_drifted, drift_pips
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_app():
+def create_app(start_executor=None):
+    """Build the app; only processes started with start_executor campaign to run trading work"""
+    if start_executor is None:
+        start_executor = Config.EXECUTOR_ENABLED
+    
     app = Flask(__name__)
     app.config.from_object(Config)
     
     # Initialize extensions
-    db.init_app(app)
+    init_storage(app, db)
+    persistence_writer.init_app(app)
     CORS(app)
     
     # Initialize trading components
     oanda_trader = OANDATrader(app)
+    async_trader = AsyncOANDATrader(oanda_trader)
     strategies = TradingStrategies(app, oanda_trader)
+    equity_history = EquityHistory(app)
     
     # Initialize Discord fetcher
     if Config.DISCORD_TOKEN and Config.DISCORD_CHANNEL_ID:
@@ -67,60 +87,174 @@ def create_app():
         
         db.session.commit()
     
-    # Trading bot thread
-    def trading_bot_loop():
+    # Identity shared by this process's signal claims and leader lease
+    executor_id = make_owner_id()
+    signal_claimer = SignalClaimer(executor_id)
+    
+    def execute_signal(signal_id):
+        """Claim a queued signal and place its order"""
+        signal_timestamp = None
+        try:
+            with app.app_context():
+                settings = TradingSettings.query.first()
+                if settings and not settings.auto_trading_enabled:
+                    logger.info("Auto trading is disabled - skipping signal processing")
+                    signal_claimer.release(signal_id)
+                    return
+                
+                # Another executor may have claimed it first
+                if not signal_claimer.claim(signal_id):
+                    return
+                
+                signal = db.session.get(Signal, signal_id)
+                if not signal:
+                    return
+                
+                # A signal taken over from a dead executor may already have an order at OANDA
+                recovering = signal.status == SUBMITTED
+                
+                # Never spend an order on a signal that waited too long or the market left behind
+                symbol = instrument_registry.resolve(signal.symbol) or signal.symbol
+                expired = is_expired(signal)
+                price_data = None if expired else oanda_trader.get_current_price(symbol)
+                stale = expired or is_drifted(signal, price_data)
+                
+                if recovering:
+                    # Settle it by client ID first; it is only sent again while still fresh
+                    trade = oanda_trader.recover_order(signal)
+                    if not trade and not stale:
+                        trade = oanda_trader.place_order(signal)
+                elif stale:
+                    trade = None
+                else:
+                    if not signal_claimer.transition(signal_id, CLAIMED, SUBMITTED):
+                        return
+                    trade = oanda_trader.place_order(signal)
+                
+                if stale and not trade:
+                    signal_claimer.transition(signal_id, SUBMITTED if recovering else CLAIMED, EXPIRED)
+                    logger.info(f"Signal {signal_id} expired: age {datetime.utcnow() - signal.timestamp}, "
+                                f"drift {drift_pips(signal, price_data)} pips")
+                    return
+                
+                if trade:
+                    signal_claimer.transition(signal_id, SUBMITTED, FILLED)
+                    signal_timestamp = signal.timestamp
+                    logger.info(f"Discord trade placed: {signal.action} {signal.symbol}")
+                else:
+                    signal_claimer.transition(signal_id, SUBMITTED, FAILED)
+                    logger.warning(f"Failed to place Discord trade: {signal.action} {signal.symbol}")
+        except OrderStatusUnknown as e:
+            # Left SUBMITTED; whoever reclaims it looks the order up before resubmitting
+            logger.error(f"Outcome of signal {signal_id} unknown: {e}")
+        except Exception as e:
+            logger.error(f"Error executing signal {signal_id}: {e}")
+        finally:
+            signal_bus.done(signal_id, signal_timestamp)
+    
+    # Signal dispatch thread: hands published signals to the pool, one FIFO lane per instrument
+    execution_pool = ExecutionPool()
+    
+    def signal_execution_worker():
         while True:
+            signal_id = signal_bus.get(timeout=1)
+            if signal_id is None:
+                continue
+            
             try:
                 with app.app_context():
-                    # Check if auto trading is enabled
-                    settings = TradingSettings.query.first()
-                    auto_trading_enabled = settings.auto_trading_enabled if settings else True
-                    
-                    if auto_trading_enabled:
-                        # Only process Discord signals (no internal strategies)
-                        unprocessed_discord_signals = Signal.query.filter(
-                            Signal.discord_message_id.notlike('strategy_%'),
-                            Signal.processed == False
-                        ).all()
-                        
-                        # Process Discord signals and place trades
-                        for signal in unprocessed_discord_signals:
-                            # Place order
-                            trade = oanda_trader.place_order(signal)
-                            if trade:
-                                signal.processed = True
-                                db.session.commit()
-                                logger.info(f"Discord trade placed: {signal.action} {signal.symbol}")
-                            else:
-                                logger.warning(f"Failed to place Discord trade: {signal.action} {signal.symbol}")
-                    else:
-                        logger.info("Auto trading is disabled - skipping signal processing")
-                    
-                    # Always update trade prices and sync data (even when auto trading is off)
-                    oanda_trader.update_trade_prices()
-                    
-                    # Add stop loss and take profit to trades that don't have them
-                    oanda_trader.add_stop_loss_take_profit_to_trades()
-                    
-                    # Sync positions
-                    oanda_trader.sync_positions()
-                    
-                    # Update account info
-                    oanda_trader.get_account_info()
-                    
-                    # Update strategy performance
-                    strategies.update_strategy_performance()
-                
-                # Sleep for 30 seconds
-                time.sleep(30)
-                
+                    signal = db.session.get(Signal, signal_id)
+                    key = (instrument_registry.resolve(signal.symbol) or signal.symbol) if signal else None
             except Exception as e:
-                logger.error(f"Error in trading bot loop: {e}")
-                time.sleep(60)  # Wait longer on error
+                logger.error(f"Error looking up signal {signal_id}: {e}")
+                key = None
+            
+            execution_pool.submit(key, execute_signal, signal_id)
     
-    # Start trading bot in background thread
-    trading_thread = threading.Thread(target=trading_bot_loop, daemon=True)
-    trading_thread.start()
+    def sweep_signals():
+        """Claim a batch of signals the bus never saw (other processes, restarts, expired claims)"""
+        with app.app_context():
+            # Unprocessed external signals only (no internal strategies), served by the partial ix_signal_pending index
+            pending = (~Signal.processed, Signal.source.in_(EXTERNAL_SIGNAL_SOURCES))
+            
+            # Shed signals that outlived their TTL, even while auto trading is paused
+            cutoffs, default_cutoff = expiry_cutoffs()
+            signal_claimer.expire_stale(cutoffs, default_cutoff, conditions=pending)
+            
+            # Check if auto trading is enabled
+            settings = TradingSettings.query.first()
+            auto_trading_enabled = settings.auto_trading_enabled if settings else True
+            
+            if not auto_trading_enabled:
+                logger.info("Auto trading is disabled - skipping signal processing")
+                return
+            
+            claimed = signal_claimer.claim_batch(conditions=pending)
+            if not claimed:
+                return
+            
+            # Expire signals the cached prices already show have drifted, without any API calls.
+            # Taken-over SUBMITTED ones may have an order at OANDA: execute_signal settles those by lookup.
+            drifted = []
+            for signal in Signal.query.filter(Signal.id.in_(claimed), Signal.status == CLAIMED).all():
+                symbol = instrument_registry.resolve(signal.symbol) or signal.symbol
+                if is_drifted(signal, oanda_trader.price_book.get(symbol, Config.PRICE_MAX_AGE_SECONDS)):
+                    drifted.append(signal.id)
+            if drifted:
+                signal_claimer.expire(drifted)
+                logger.info(f"Expired {len(drifted)} signals that drifted more than {Config.MAX_SLIPPAGE_PIPS} pips")
+            
+            for signal_id in claimed:
+                if signal_id not in drifted:
+                    signal_bus.publish(signal_id)
+    
+    # Maintenance jobs, each on its own cadence (they run even when auto trading is off).
+    # Every executor sweeps for signals and resyncs its own exposure ledger; the rest only run on the leader.
+    is_leader = lambda: leader.is_leader
+    job_scheduler = JobScheduler()
+    job_scheduler.add_job('prices', oanda_trader.update_trade_prices,
+                          Config.JOB_PRICES_INTERVAL, timeout=Config.JOB_PRICES_INTERVAL * 5, when=is_leader)
+    job_scheduler.add_job('sl_tp', oanda_trader.add_stop_loss_take_profit_to_trades,
+                          Config.JOB_SL_TP_INTERVAL, jitter=1, timeout=30, when=is_leader)
+    job_scheduler.add_job('positions', oanda_trader.sync_positions,
+                          Config.JOB_POSITIONS_INTERVAL, jitter=1, timeout=30, when=is_leader)
+    job_scheduler.add_job('account', oanda_trader.get_account_info,
+                          Config.JOB_ACCOUNT_INTERVAL, jitter=1, timeout=30, when=is_leader)
+    job_scheduler.add_job('strategy_stats', strategies.update_strategy_performance,
+                          Config.JOB_STRATEGY_STATS_INTERVAL, jitter=10, timeout=120, when=is_leader)
+    job_scheduler.add_job('signal_sweep', sweep_signals,
+                          Config.JOB_SIGNAL_SWEEP_INTERVAL, jitter=2, timeout=60)
+    job_scheduler.add_job('exposure', oanda_trader.sync_exposure,
+                          Config.JOB_EXPOSURE_INTERVAL, jitter=5, timeout=30)
+    job_scheduler.add_job('equity_rollup', equity_history.rollup,
+                          Config.JOB_EQUITY_ROLLUP_INTERVAL, jitter=5, timeout=60, when=is_leader)
+    
+    def on_elected():
+        # Close trades as their SL/TP fills arrive instead of pricing them forever
+        oanda_trader.start_transaction_stream()
+    
+    def on_revoked():
+        oanda_trader.stop_transaction_stream()
+    
+    # Exactly one process holding the lease runs maintenance; executors split signals through claims
+    leader = LeaderElector(app, 'executor', on_elected=on_elected, on_revoked=on_revoked, owner=executor_id)
+    
+    if start_executor:
+        # Stream prices so the hot paths read from memory
+        oanda_trader.start_price_stream()
+        
+        # Start signal execution, maintenance jobs and leader election in background threads
+        execution_pool.start()
+        signal_bus.subscribe()
+        execution_thread = threading.Thread(target=signal_execution_worker, daemon=True)
+        execution_thread.start()
+        
+        job_scheduler.start()
+        leader.start()
+        
+        # Load risk limits and exposure, then pick up anything left over from before this process started
+        job_scheduler.run_now('exposure')
+        job_scheduler.run_now('signal_sweep')
     
     # Routes
     @app.route('/')
@@ -141,6 +275,20 @@ def create_app():
             logger.error(f"Error getting account data: {e}")
             return jsonify({'error': str(e)}), 500
     
+    @app.route('/api/equity_history')
+    def get_equity_history():
+        try:
+            end = parse_utc(request.args['end']) if 'end' in request.args else datetime.utcnow()
+            start = parse_utc(request.args['start']) if 'start' in request.args else end - timedelta(days=1)
+            points = request.args.get('points', Config.EQUITY_HISTORY_POINTS, type=int)
+            return jsonify(equity_history.query(start, end, points))
+        except ValueError as e:
+            # Unparseable timestamps, start not before end, or too few points
+            return jsonify({'error': f'Invalid request: {e}'}), 400
+        except Exception as e:
+            logger.error(f"Error getting equity history: {e}")
+            return jsonify({'error': str(e)}), 500
+    
     @app.route('/api/trades')
     def get_trades():
         try:
@@ -160,8 +308,16 @@ def create_app():
     @app.route('/api/positions')
     def get_positions():
         try:
-            positions = Position.query.all()
-            return jsonify([position.to_dict() for position in positions])
+            # Clients that already hold the current snapshot get a 304 without the positions query
+            snapshot = db.session.get(SnapshotVersion, 'positions')
+            etag = f"positions-{snapshot.version if snapshot else 0}"
+            if etag in request.if_none_match:
+                response = app.response_class(status=304)
+            else:
+                positions = Position.query.all()
+                response = jsonify([position.to_dict() for position in positions])
+            response.set_etag(etag)
+            return response
         except Exception as e:
             logger.error(f"Error getting positions: {e}")
             return jsonify({'error': str(e)}), 500
@@ -185,6 +341,84 @@ def create_app():
             logger.error(f"Error getting strategies: {e}")
             return jsonify({'error': str(e)}), 500
     
+    @app.route('/api/candles/<instrument>')
+    def get_candles(instrument):
+        try:
+            # Both end up in file paths under the candle store, so only known values get that far
+            instrument = instrument_registry.resolve(instrument)
+            if not instrument:
+                return jsonify({'error': 'Unknown instrument'}), 400
+            granularity = request.args.get('granularity', 'H1')
+            if granularity not in GRANULARITY_SECONDS:
+                return jsonify({'error': f"Unsupported granularity, expected one of {', '.join(GRANULARITY_SECONDS)}"}), 400
+            end = request.args.get('end', int(time.time()), type=int)
+            start = request.args.get('start', end - 7 * 86400, type=int)
+            
+            candles = oanda_trader.candle_store.get_candles(instrument, granularity, start, end)
+            return jsonify({name: column.tolist() for name, column in candles.items()})
+        except Exception as e:
+            logger.error(f"Error getting candles: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/jobs')
+    def get_jobs():
+        try:
+            return jsonify(job_scheduler.get_stats())
+        except Exception as e:
+            logger.error(f"Error getting job stats: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/signal_bus')
+    def get_signal_bus_metrics():
+        try:
+            return jsonify(signal_bus.get_metrics())
+        except Exception as e:
+            logger.error(f"Error getting signal bus metrics: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/execution_pool')
+    def get_execution_pool_metrics():
+        try:
+            return jsonify(execution_pool.get_metrics())
+        except Exception as e:
+            logger.error(f"Error getting execution pool metrics: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/persistence')
+    def get_persistence_stats():
+        try:
+            return jsonify(persistence_writer.get_stats())
+        except Exception as e:
+            logger.error(f"Error getting persistence stats: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/exposure')
+    def get_exposure():
+        try:
+            return jsonify(oanda_trader.exposure_ledger.get_snapshot())
+        except Exception as e:
+            logger.error(f"Error getting exposure: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/leader')
+    def get_leader_status():
+        try:
+            status = leader.get_status()
+            status['executor_enabled'] = start_executor
+            return jsonify(status)
+        except Exception as e:
+            logger.error(f"Error getting leader status: {e}")
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/api/request_scheduler')
+    def get_request_scheduler_metrics():
+        try:
+            from request_scheduler import request_scheduler
+            return jsonify(request_scheduler.get_metrics())
+        except Exception as e:
+            logger.error(f"Error getting request scheduler metrics: {e}")
+            return jsonify({'error': str(e)}), 500
+    
     @app.route('/api/close_trade/<trade_id>', methods=['POST'])
     def close_trade(trade_id):
         try:
@@ -216,13 +450,8 @@ def create_app():
     @app.route('/api/refresh_data', methods=['POST'])
     def refresh_data():
         try:
-            with app.app_context():
-                # Update all data
-                oanda_trader.update_trade_prices()
-                oanda_trader.add_stop_loss_take_profit_to_trades()
-                oanda_trader.sync_positions()
-                oanda_trader.get_account_info()
-                strategies.update_strategy_performance()
+            # Update all data concurrently
+            asyncio.run(async_trader.refresh_all(strategies))
             
             return jsonify({'message': 'Data refreshed successfully'})
         except Exception as e:
@@ -249,7 +478,10 @@ def create_app():
             return jsonify({
                 'message': f"Closed {result['closed']} trades, {result['failed']} failed",
                 'closed': result['closed'],
-                'failed': result['failed']
+                'failed': result['failed'],
+                'results': result.get('results', []),
+                'elapsed': result.get('elapsed'),
+                'record_error': result.get('record_error')
             })
         except Exception as e:
             logger.error(f"Error closing all trades: {e}")
@@ -563,12 +795,19 @@ def create_app():
             fetcher = TradingViewSignalFetcher(app)
             signal = fetcher.process_webhook_signal(webhook_data)
             
-            if signal:
+            if signal and signal_bus.subscribed:
                 return jsonify({
                     'success': True,
                     'message': 'Signal processed successfully',
                     'signal_id': signal.id
                 }), 200
+            elif signal:
+                # No executor in this process: stored for the next executor sweep
+                return jsonify({
+                    'success': True,
+                    'message': 'Signal queued',
+                    'signal_id': signal.id
+                }), 202
             else:
                 return jsonify({
                     'success': False,
@@ -584,14 +823,13 @@ def create_app():
     
     return app
 
-def start_discord_bot():
-    """Start Discord bot in a separate thread"""
+def start_discord_bot(app):
+    """Start Discord bot in a separate thread, sharing the app (and its executor) of this process"""
     try:
         if Config.DISCORD_TOKEN and Config.DISCORD_CHANNEL_ID:
             import asyncio
             from discord_fetcher import DiscordSignalFetcher
             
-            app = create_app()
             discord_fetcher = DiscordSignalFetcher(app)
             
             # Run Discord bot
@@ -605,7 +843,7 @@ if __name__ == '__main__':
     # Start Discord bot in a separate thread
     if Config.DISCORD_TOKEN and Config.DISCORD_CHANNEL_ID:
         import threading
-        discord_thread = threading.Thread(target=start_discord_bot, daemon=True)
+        discord_thread = threading.Thread(target=start_discord_bot, args=(app,), daemon=True)
         discord_thread.start()
         logger.info("Discord bot started in background thread")
     
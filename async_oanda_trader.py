@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Async OANDA Trader
+This module exposes the OANDATrader surface as coroutines so independent OANDA calls run concurrently on one event loop.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class AsyncOANDATrader:
+    """Coroutine interface over OANDATrader backed by the shared pooled transport"""
+
+    def __init__(self, oanda_trader, max_workers=None):
+        self.trader = oanda_trader
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.ASYNC_TRADER_WORKERS,
+            thread_name_prefix='oanda-async'
+        )
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def place_order(self, signal):
+        return await self._call(self.trader.place_order, signal)
+
+    async def close_trade(self, trade_id):
+        return await self._call(self.trader.close_trade, trade_id)
+
+    async def close_all_trades(self):
+        return await self._call(self.trader.close_all_trades)
+
+    async def get_open_trades(self):
+        return await self._call(self.trader.get_open_trades)
+
+    async def get_positions(self):
+        return await self._call(self.trader.get_positions)
+
+    async def get_account_info(self):
+        return await self._call(self.trader.get_account_info)
+
+    async def get_current_prices(self, symbols):
+        return await self._call(self.trader.get_current_prices, list(symbols))
+
+    async def refresh_all(self, strategies=None):
+        """
+        Run one maintenance cycle: OANDA reads in flight at once, then the database writes one after another.
+
+        The writers touch the same Trade rows, so running them concurrently would race their commits.
+        The price reads warm the price book, which the writers then read from instead of the network.
+        """
+        symbols = await self._call(self.trader.open_trade_instruments)
+        reads = await asyncio.gather(
+            self.get_current_prices(symbols),
+            self.get_positions(),
+            self.get_account_info(),
+            return_exceptions=True
+        )
+        positions = reads[1]
+
+        writes = [self.trader.update_trade_prices, self.trader.add_stop_loss_take_profit_to_trades]
+        if isinstance(positions, list):
+            writes.append(functools.partial(self.trader.sync_positions, positions))
+        else:
+            logger.warning("Skipping position sync: positions could not be fetched")
+        if strategies:
+            writes.append(strategies.update_strategy_performance)
+
+        results = list(reads)
+        for write in writes:
+            try:
+                results.append(await self._call(write))
+            except Exception as e:
+                results.append(e)
+
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error in maintenance cycle: {result}")
+
+        return results
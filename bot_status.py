@@ -13,7 +13,7 @@ from datetime import datetime, timedelta
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
-from models import Signal, Trade, TradingSettings
+from models import Signal, Trade, TradingSettings, EXTERNAL_SIGNAL_SOURCES
 from config import Config
 
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +28,7 @@ def main():
     
     try:
         # Create Flask app
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # 1. Configuration Status
@@ -59,7 +59,7 @@ def main():
             print("📊 SIGNAL STATISTICS")
             print("-" * 30)
             total_signals = Signal.query.count()
-            discord_signals = Signal.query.filter(Signal.discord_message_id.notlike('strategy_%')).count()
+            discord_signals = Signal.query.filter(Signal.source.in_(EXTERNAL_SIGNAL_SOURCES)).count()
             strategy_signals = total_signals - discord_signals
             
             print(f"Total Signals: {total_signals}")
@@ -109,7 +109,7 @@ def main():
                 print(f"📨 Discord Signals Received: {discord_signals}")
                 
                 if discord_signals > 0:
-                    latest_discord = Signal.query.filter(Signal.discord_message_id.notlike('strategy_%')).order_by(Signal.timestamp.desc()).first()
+                    latest_discord = Signal.query.filter(Signal.source.in_(EXTERNAL_SIGNAL_SOURCES)).order_by(Signal.timestamp.desc()).first()
                     if latest_discord:
                         print(f"🕒 Latest Discord Signal: {latest_discord.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
             else:
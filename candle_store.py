@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Candle Store
+This module caches OANDA candles on disk as columnar NumPy files and backfills only the ranges not yet cached.
+"""
+
+import os
+import json
+import time
+import calendar
+import threading
+import logging
+from datetime import datetime
+import numpy as np
+import oandapyV20.endpoints.instruments as instruments
+from config import Config
+from instrument_registry import instrument_registry
+
+logger = logging.getLogger(__name__)
+
+CANDLE_DTYPE = np.dtype([
+    ('time', 'i8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'i8')
+])
+
+GRANULARITY_SECONDS = {
+    'S5': 5, 'S10': 10, 'S15': 15, 'S30': 30,
+    'M1': 60, 'M2': 120, 'M4': 240, 'M5': 300, 'M10': 600, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H2': 7200, 'H3': 10800, 'H4': 14400, 'H6': 21600, 'H8': 28800, 'H12': 43200,
+    'D': 86400, 'W': 604800
+}
+
+# Maximum candles OANDA returns per request
+MAX_CANDLES_PER_REQUEST = 5000
+
+def to_rfc3339(timestamp):
+    return datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def from_rfc3339(value):
+    return calendar.timegm(datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').timetuple())
+
+class CandleStore:
+    """Per instrument/granularity candle files with coverage tracking and zero-copy reads"""
+
+    def __init__(self, client, root=None):
+        self.client = client
+        self.root = root or Config.CANDLE_STORE_PATH
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def get_candles(self, instrument, granularity, start, end):
+        """
+        Get candles for [start, end), fetching only ranges that are not cached yet.
+
+        Args:
+            instrument (str): OANDA instrument name
+            granularity (str): OANDA granularity (M1, H1, D...)
+            start (int): Range start, UNIX seconds
+            end (int): Range end, UNIX seconds
+
+        Returns:
+            dict: Column name -> read-only NumPy array view
+        """
+        if granularity not in GRANULARITY_SECONDS:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        if instrument_registry.resolve(instrument) != instrument:
+            raise ValueError(f"Unknown instrument: {instrument}")
+
+        with self._lock_for(instrument, granularity):
+            for gap_start, gap_end in self._missing_ranges(instrument, granularity, start, end):
+                self._backfill(instrument, granularity, gap_start, gap_end)
+
+        candles = self._read(instrument, granularity)
+        first = np.searchsorted(candles['time'], start, side='left')
+        last = np.searchsorted(candles['time'], end, side='left')
+        view = candles[first:last]
+        return {name: view[name] for name in CANDLE_DTYPE.names}
+
+    def _backfill(self, instrument, granularity, start, end):
+        """Fetch [start, end) page by page and merge it into the store"""
+        step = GRANULARITY_SECONDS[granularity]
+        covered_end = min(end, int(time.time()) - step)  # Never cache the forming candle
+        if covered_end <= start:
+            return
+
+        rows = []
+        cursor = start
+        while cursor < covered_end:
+            params = {
+                "granularity": granularity,
+                "from": to_rfc3339(cursor),
+                "count": MAX_CANDLES_PER_REQUEST,
+                "price": "M"
+            }
+            r = instruments.InstrumentsCandles(instrument=instrument, params=params)
+            response = self.client.request(r)
+
+            page = [candle for candle in response.get('candles', []) if candle.get('complete')]
+            for candle in page:
+                candle_time = from_rfc3339(candle['time'])
+                if candle_time >= covered_end:
+                    break
+                mid = candle['mid']
+                rows.append((candle_time, float(mid['o']), float(mid['h']), float(mid['l']),
+                             float(mid['c']), int(candle['volume'])))
+
+            if len(response.get('candles', [])) < MAX_CANDLES_PER_REQUEST or not page:
+                break
+            cursor = from_rfc3339(page[-1]['time']) + step
+
+        data_file = self._merge(instrument, granularity, np.array(rows, dtype=CANDLE_DTYPE))
+        self._add_coverage(instrument, granularity, start, covered_end, data_file)
+        logger.info(f"Backfilled {len(rows)} {instrument} {granularity} candles")
+
+    def _read(self, instrument, granularity):
+        path = self._data_path(instrument, granularity)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.load(path, mmap_mode='r')
+
+    def _merge(self, instrument, granularity, new_rows):
+        """
+        Write existing plus new candles to a new versioned file.
+
+        A file that is memory-mapped (by a reader still holding a view) cannot be replaced on
+        Windows, so every merge gets its own file and the coverage manifest switches to it.
+
+        Returns:
+            str: Name of the new data file, or None if there was nothing to add
+        """
+        if not len(new_rows):
+            return None
+
+        existing = np.array(self._read(instrument, granularity))
+        merged = np.concatenate([existing, new_rows])
+        _, unique_index = np.unique(merged['time'][::-1], return_index=True)
+        merged = merged[::-1][unique_index]  # Sorted by time, newest fetch wins
+
+        directory = os.path.join(self.root, instrument)
+        os.makedirs(directory, exist_ok=True)
+        data_file = f"{granularity}.{time.time_ns()}.npy"
+        np.save(os.path.join(directory, data_file), merged)
+        return data_file
+
+    def _remove_stale_versions(self, instrument, granularity, keep):
+        """Delete superseded data files; ones still mapped (Windows) are retried after the next merge"""
+        directory = os.path.join(self.root, instrument)
+        for name in os.listdir(directory):
+            if name in keep or not (name.startswith(f"{granularity}.") and name.endswith('.npy')):
+                continue
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError as e:
+                logger.debug(f"Could not remove old candle file {name} yet: {e}")
+
+    def _missing_ranges(self, instrument, granularity, start, end):
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self._coverage(instrument, granularity):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _manifest(self, instrument, granularity):
+        """Covered ranges and the current data file ('data' is absent for stores written before versioning)"""
+        path = self._coverage_path(instrument, granularity)
+        if not os.path.exists(path):
+            return {'ranges': []}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _coverage(self, instrument, granularity):
+        return [tuple(r) for r in self._manifest(instrument, granularity)['ranges']]
+
+    def _add_coverage(self, instrument, granularity, start, end, data_file=None):
+        manifest = self._manifest(instrument, granularity)
+        previous_file = manifest.get('data')
+        ranges = sorted([tuple(r) for r in manifest['ranges']] + [(start, end)])
+        merged = []
+        for range_start, range_end in ranges:
+            if merged and range_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+
+        manifest = {'ranges': merged}
+        if data_file or previous_file:
+            manifest['data'] = data_file or previous_file
+
+        # The manifest is never mapped, so replacing it is safe everywhere and switches readers over atomically
+        path = self._coverage_path(instrument, granularity)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+        if data_file:
+            # The file just superseded stays one more round for readers that resolved it before the switch
+            self._remove_stale_versions(instrument, granularity, {data_file, previous_file or f"{granularity}.npy"})
+
+    def _data_path(self, instrument, granularity):
+        data_file = self._manifest(instrument, granularity).get('data', f"{granularity}.npy")
+        return os.path.join(self.root, instrument, data_file)
+
+    def _coverage_path(self, instrument, granularity):
+        return os.path.join(self.root, instrument, f"{granularity}.coverage.json")
+
+    def _lock_for(self, instrument, granularity):
+        with self._locks_lock:
+            return self._locks.setdefault((instrument, granularity), threading.Lock())
@@ -25,7 +25,7 @@ def main():
     
     try:
         # Create Flask app
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # Get all signals
@@ -67,6 +67,9 @@ def main():
         if result.get('error'):
             print(f"⚠️  Error: {result['error']}")
         
+        if result.get('record_error'):
+            print(f"⚠️  Closed at OANDA but not recorded locally: {result['record_error']}")
+        
         if result['closed'] > 0:
             print("🎉 All trades closed successfully!")
         else:
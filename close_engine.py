@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Emergency Close Engine
+This module closes every open trade in parallel and records the results with a single bulk update.
+"""
+
+import time
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import case, update
+import oandapyV20.endpoints.positions as positions
+import oandapyV20.endpoints.trades as trades
+from models import db, Trade
+from config import Config
+from request_scheduler import request_scheduler, CLOSE
+
+logger = logging.getLogger(__name__)
+
+class EmergencyCloseEngine:
+    """Closes all open trades per instrument (PositionClose) or per trade (TradeClose) across a worker pool"""
+
+    def __init__(self, oanda_trader, max_workers=None, mode=None):
+        self.trader = oanda_trader
+        self.max_workers = max_workers or Config.CLOSE_ALL_WORKERS
+        self.mode = mode or Config.CLOSE_ALL_MODE
+
+    def close_all(self):
+        """
+        Close every open trade.
+
+        Returns:
+            dict: closed/failed counts, per-trade results and total wall time in seconds
+        """
+        start = time.monotonic()
+        with request_scheduler.priority(CLOSE):
+            open_trades = self.trader.get_open_trades()
+
+        if not open_trades:
+            return {'closed': 0, 'failed': 0, 'results': [], 'elapsed': time.monotonic() - start}
+
+        if self.mode == 'trades':
+            tasks = [(self._close_trade, trade) for trade in open_trades]
+        else:
+            by_instrument = defaultdict(list)
+            for trade in open_trades:
+                by_instrument[trade['instrument']].append(trade)
+            tasks = [(self._close_position, instrument_trades) for instrument_trades in by_instrument.values()]
+
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            for task_results in executor.map(lambda task: task[0](task[1]), tasks):
+                results.extend(task_results)
+
+        # OANDA has already closed these; a bookkeeping failure must not hide that from the caller
+        record_error = self._record_closes([result for result in results if result['status'] == 'CLOSED'])
+
+        closed_count = len([result for result in results if result['status'] == 'CLOSED'])
+        failed_count = len(results) - closed_count
+        elapsed = time.monotonic() - start
+
+        logger.info(f"Closed {closed_count} trades, {failed_count} failed in {elapsed:.2f}s")
+        summary = {'closed': closed_count, 'failed': failed_count, 'results': results, 'elapsed': elapsed}
+        if record_error:
+            summary['record_error'] = record_error
+        return summary
+
+    def _close_position(self, instrument_trades):
+        """Close both sides of one instrument's position with a single PositionClose"""
+        instrument = instrument_trades[0]['instrument']
+        data = {}
+        if any(trade['units'] > 0 for trade in instrument_trades):
+            data['longUnits'] = 'ALL'
+        if any(trade['units'] < 0 for trade in instrument_trades):
+            data['shortUnits'] = 'ALL'
+
+        try:
+            r = positions.PositionClose(accountID=self.trader.account_id, instrument=instrument, data=data)
+            response = self.trader.client.request(r)
+
+            closed = {}
+            for key in ('longOrderFillTransaction', 'shortOrderFillTransaction'):
+                fill_transaction = response.get(key)
+                if fill_transaction:
+                    for trade_closed in fill_transaction.get('tradesClosed', []):
+                        closed[trade_closed['tradeID']] = trade_closed
+
+            results = []
+            for trade in instrument_trades:
+                trade_closed = closed.get(trade['id'])
+                if trade_closed:
+                    results.append(self._result(trade, 'CLOSED', trade_closed['price'], trade_closed['realizedPL']))
+                else:
+                    results.append(self._result(trade, 'FAILED', error='Not in position close fill'))
+            return results
+
+        except Exception as e:
+            logger.error(f"Error closing position {instrument}: {e}")
+            return [self._result(trade, 'FAILED', error=str(e)) for trade in instrument_trades]
+
+    def _close_trade(self, trade):
+        """Close a single trade with TradeClose"""
+        try:
+            r = trades.TradeClose(accountID=self.trader.account_id, tradeID=trade['id'], data={"units": "ALL"})
+            response = self.trader.client.request(r)
+
+            fill_transaction = response.get('orderFillTransaction')
+            if fill_transaction:
+                return [self._result(trade, 'CLOSED', fill_transaction['price'], fill_transaction['pl'])]
+            return [self._result(trade, 'FAILED', error='No fill transaction')]
+
+        except Exception as e:
+            logger.error(f"Error closing trade {trade['id']}: {e}")
+            return [self._result(trade, 'FAILED', error=str(e))]
+
+    def _result(self, trade, status, price=None, pnl=None, error=None):
+        return {
+            'trade_id': trade['id'],
+            'instrument': trade['instrument'],
+            'status': status,
+            'close_price': float(price) if price is not None else None,
+            'pnl': float(pnl) if pnl is not None else None,
+            'error': error
+        }
+
+    def _record_closes(self, closed_results):
+        """
+        Mark all closed trades in one UPDATE statement and drop them from the exposure ledger.
+
+        Returns:
+            str: Description of what could not be recorded, or None if everything was
+        """
+        if not closed_results:
+            return None
+
+        close_prices = {result['trade_id']: result['close_price'] for result in closed_results}
+        pnls = {result['trade_id']: result['pnl'] for result in closed_results}
+        errors = []
+
+        try:
+            for trade_id in close_prices:
+                self.trader.exposure_ledger.close(trade_id)
+        except Exception as e:
+            # The next exposure resync rebuilds the ledger from OANDA
+            logger.error(f"Error releasing closed trades from the exposure ledger: {e}")
+            errors.append(f"exposure ledger: {e}")
+
+        try:
+            with self.trader.app.app_context():
+                try:
+                    db.session.execute(
+                        update(Trade)
+                        .where(Trade.oanda_trade_id.in_(list(close_prices)))
+                        .values(
+                            status='CLOSED',
+                            close_timestamp=datetime.utcnow(),
+                            close_price=case(close_prices, value=Trade.oanda_trade_id),
+                            pnl=case(pnls, value=Trade.oanda_trade_id)
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+        except Exception as e:
+            # Reconciliation marks them closed later; the caller still learns what OANDA closed
+            logger.error(f"Error recording {len(close_prices)} closed trades: {e}")
+            errors.append(f"database: {e}")
+
+        return '; '.join(errors) or None
@@ -1,4 +1,5 @@
 import os
+import re
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,16 +14,92 @@ class Config:
     OANDA_ACCOUNT_ID = os.getenv('OANDA_ACCOUNT_ID')
     OANDA_ENVIRONMENT = os.getenv('OANDA_ENVIRONMENT', 'practice')  # 'practice' or 'live'
     
+    # OANDA Transport Configuration
+    OANDA_POOL_SIZE = int(os.getenv('OANDA_POOL_SIZE', '20'))
+    OANDA_CONNECT_TIMEOUT = float(os.getenv('OANDA_CONNECT_TIMEOUT', '3.05'))
+    OANDA_READ_TIMEOUT = float(os.getenv('OANDA_READ_TIMEOUT', '10'))
+    OANDA_STREAM_READ_TIMEOUT = float(os.getenv('OANDA_STREAM_READ_TIMEOUT', '30'))  # Streams send heartbeats every 5s
+    OANDA_MAX_RETRIES = int(os.getenv('OANDA_MAX_RETRIES', '3'))  # GET requests only
+    ORDER_SUBMIT_RETRIES = int(os.getenv('ORDER_SUBMIT_RETRIES', '2'))  # Resubmits after confirming by client ID
+    OANDA_RETRY_BACKOFF = float(os.getenv('OANDA_RETRY_BACKOFF', '0.25'))
+    OANDA_RATE_LIMIT = float(os.getenv('OANDA_RATE_LIMIT', '100'))  # Requests per second across the process
+    OANDA_RATE_BURST = float(os.getenv('OANDA_RATE_BURST', '20'))
+    ASYNC_TRADER_WORKERS = int(os.getenv('ASYNC_TRADER_WORKERS', '8'))  # Concurrent OANDA calls from the async trader
+    EXECUTION_WORKERS = int(os.getenv('EXECUTION_WORKERS', '4'))  # Signals for different instruments executed in parallel
+    
+    # Price Stream Configuration
+    PRICE_STREAM_ENABLED = os.getenv('PRICE_STREAM_ENABLED', 'True').lower() == 'true'
+    PRICE_STREAM_INSTRUMENTS = [s for s in os.getenv('PRICE_STREAM_INSTRUMENTS', 'EUR_USD,GBP_USD,USD_JPY').split(',') if s]
+    PRICE_MAX_AGE_SECONDS = float(os.getenv('PRICE_MAX_AGE_SECONDS', '5'))  # Staleness budget before falling back to polling
+    
+    # Transaction Stream Configuration
+    TRANSACTION_STREAM_ENABLED = os.getenv('TRANSACTION_STREAM_ENABLED', 'True').lower() == 'true'
+    
+    # Instrument Registry Configuration
+    INSTRUMENT_CACHE_PATH = os.getenv('INSTRUMENT_CACHE_PATH', 'instance/instruments.json')
+    INSTRUMENT_CACHE_TTL = int(os.getenv('INSTRUMENT_CACHE_TTL', '86400'))  # Refetch from OANDA once a day
+    
+    # Candle Store Configuration
+    CANDLE_STORE_PATH = os.getenv('CANDLE_STORE_PATH', 'instance/candles')
+    
     # Database Configuration
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///trading_bot.db')
+    # Hosted Postgres often hands out postgres:// URLs, which SQLAlchemy no longer accepts
+    SQLALCHEMY_DATABASE_URI = re.sub(r'^postgres://', 'postgresql://', os.getenv('DATABASE_URL', 'sqlite:///trading_bot.db'))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))  # Postgres only; SQLite has a single writer anyway
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))  # Wait this long for the write lock
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', '268435456'))  # Bytes of the file read through mmap
+    PERSISTENCE_QUEUE_SIZE = int(os.getenv('PERSISTENCE_QUEUE_SIZE', '10000'))  # Pending mutations before producers block
+    PERSISTENCE_BATCH_SIZE = int(os.getenv('PERSISTENCE_BATCH_SIZE', '200'))  # Mutations per group commit
+    PERSISTENCE_BATCH_WINDOW = float(os.getenv('PERSISTENCE_BATCH_WINDOW', '0.02'))  # Seconds to gather a batch
+    PERSISTENCE_TIMEOUT = float(os.getenv('PERSISTENCE_TIMEOUT', '10'))  # Max wait to queue, or for a durable result
     
     # Trading Configuration
     DEFAULT_LOT_SIZE = float(os.getenv('DEFAULT_LOT_SIZE', '0.01'))
     MAX_RISK_PERCENT = float(os.getenv('MAX_RISK_PERCENT', '2.0'))
+    POSITION_SIZING_MODE = os.getenv('POSITION_SIZING_MODE', 'risk')  # 'risk' (equity, risk % and SL distance) or 'lot'
+    CLOSE_ALL_MODE = os.getenv('CLOSE_ALL_MODE', 'positions')  # 'positions' (PositionClose per instrument) or 'trades'
+    CLOSE_ALL_WORKERS = int(os.getenv('CLOSE_ALL_WORKERS', '8'))
     STOP_LOSS_PIPS = int(os.getenv('STOP_LOSS_PIPS', '50'))  # 0.5% stop loss
     TAKE_PROFIT_PIPS = int(os.getenv('TAKE_PROFIT_PIPS', '100'))  # 1% take profit
     
+    # Executor Configuration
+    EXECUTOR_ENABLED = os.getenv('EXECUTOR_ENABLED', 'True').lower() == 'true'  # Campaign for the executor lease
+    LEADER_LEASE_TTL = float(os.getenv('LEADER_LEASE_TTL', '30'))
+    SIGNAL_CLAIM_TTL = float(os.getenv('SIGNAL_CLAIM_TTL', '60'))  # Unsubmitted claims return to the pool after this
+    SIGNAL_CLAIM_BATCH = int(os.getenv('SIGNAL_CLAIM_BATCH', '50'))
+    
+    # Signal Freshness (older or drifted signals are expired instead of executed)
+    SIGNAL_TTL_SECONDS = {  # Keyed by Signal.source
+        'DISCORD': float(os.getenv('SIGNAL_TTL_DISCORD', '300')),
+        'TRADINGVIEW': float(os.getenv('SIGNAL_TTL_TRADINGVIEW', '120')),
+        'MANUAL': float(os.getenv('SIGNAL_TTL_MANUAL', '900')),
+        'TEST': float(os.getenv('SIGNAL_TTL_TEST', '60')),
+        'STRATEGY': float(os.getenv('SIGNAL_TTL_STRATEGY', '300'))
+    }
+    SIGNAL_TTL_DEFAULT = float(os.getenv('SIGNAL_TTL_DEFAULT', '300'))  # Rows without a source (not yet migrated)
+    MAX_SLIPPAGE_PIPS = float(os.getenv('MAX_SLIPPAGE_PIPS', '20'))  # Max distance from entry_price to the live mid
+    
+    # Maintenance Job Intervals (seconds)
+    JOB_PRICES_INTERVAL = float(os.getenv('JOB_PRICES_INTERVAL', '2'))
+    JOB_SL_TP_INTERVAL = float(os.getenv('JOB_SL_TP_INTERVAL', '10'))
+    JOB_POSITIONS_INTERVAL = float(os.getenv('JOB_POSITIONS_INTERVAL', '10'))
+    JOB_ACCOUNT_INTERVAL = float(os.getenv('JOB_ACCOUNT_INTERVAL', '15'))
+    JOB_STRATEGY_STATS_INTERVAL = float(os.getenv('JOB_STRATEGY_STATS_INTERVAL', '300'))
+    JOB_SIGNAL_SWEEP_INTERVAL = float(os.getenv('JOB_SIGNAL_SWEEP_INTERVAL', '30'))
+    JOB_EXPOSURE_INTERVAL = float(os.getenv('JOB_EXPOSURE_INTERVAL', '60'))
+    JOB_EQUITY_ROLLUP_INTERVAL = float(os.getenv('JOB_EQUITY_ROLLUP_INTERVAL', '60'))
+    
+    # Equity History Configuration
+    EQUITY_SNAPSHOT_RETENTION_DAYS = int(os.getenv('EQUITY_SNAPSHOT_RETENTION_DAYS', '7'))  # Raw snapshots; 1h/1d are kept forever
+    EQUITY_MINUTE_RETENTION_DAYS = int(os.getenv('EQUITY_MINUTE_RETENTION_DAYS', '90'))
+    EQUITY_HISTORY_POINTS = int(os.getenv('EQUITY_HISTORY_POINTS', '500'))  # Default points returned per chart
+    EQUITY_HISTORY_MAX_SOURCE_POINTS = int(os.getenv('EQUITY_HISTORY_MAX_SOURCE_POINTS', '5000'))  # Rows read per query, at most
+    
     # Web App Configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Currency Conversion
+This module converts amounts into the account currency with a rate matrix rebuilt once per price book tick.
+"""
+
+import time
+import threading
+import logging
+from instrument_registry import instrument_registry
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def conversion_instruments(currency, account_currency):
+    """
+    Instruments whose prices convert currency into the account currency.
+
+    Returns:
+        list: A direct pair, a pair through USD, or [] if none is tradeable (or no conversion is needed)
+    """
+    if currency == account_currency:
+        return []
+
+    names = set(instrument_registry.names())
+    direct = _direct_pair(currency, account_currency, names)
+    if direct:
+        return [direct]
+
+    # No direct pair (e.g. JPY into a GBP account): cross through USD
+    to_usd = _direct_pair(currency, 'USD', names)
+    usd_to_account = _direct_pair('USD', account_currency, names)
+    if to_usd and usd_to_account:
+        return [to_usd, usd_to_account]
+
+    logger.warning(f"No conversion path from {currency} to {account_currency}")
+    return []
+
+def _direct_pair(currency, other, names):
+    for pair in (f"{currency}_{other}", f"{other}_{currency}"):
+        if pair in names:
+            return pair
+    return None
+
+class ConversionMatrix:
+    """Rates from every priced currency into one account currency, derived from a single price snapshot"""
+
+    def __init__(self, account_currency, prices):
+        self.account_currency = account_currency
+        self.rates = {account_currency: 1.0}
+
+        direct_to_usd = {'USD': 1.0}
+        for instrument, price in prices.items():
+            base, _, quote = instrument.partition('_')
+            mid = price['mid']
+            if quote == account_currency:
+                self.rates.setdefault(base, mid)
+            elif base == account_currency:
+                self.rates.setdefault(quote, 1 / mid)
+            if quote == 'USD':
+                direct_to_usd.setdefault(base, mid)
+            elif base == 'USD':
+                direct_to_usd.setdefault(quote, 1 / mid)
+
+        # Anything without a direct pair goes through USD
+        usd_rate = self.rates.get('USD')
+        if usd_rate:
+            for currency, to_usd in direct_to_usd.items():
+                self.rates.setdefault(currency, to_usd * usd_rate)
+
+    def rate(self, currency):
+        """Multiplier from currency into the account currency, or None if not priced"""
+        return self.rates.get(currency)
+
+    def to_account(self, amount, currency):
+        rate = self.rates.get(currency)
+        return amount * rate if rate is not None else None
+
+class CurrencyConverter:
+    """Serves the conversion matrix for the price book's current tick, rebuilding it when prices change or age out"""
+
+    def __init__(self, price_book, max_age=None):
+        self.price_book = price_book
+        self.max_age = max_age if max_age is not None else Config.PRICE_MAX_AGE_SECONDS
+        self._matrix = None
+        self._version = None
+        self._expires = None
+        self._lock = threading.Lock()
+
+    def matrix(self, account_currency):
+        version = self.price_book.version
+        with self._lock:
+            matrix = self._matrix
+            if (not matrix or self._version != version or matrix.account_currency != account_currency
+                    or time.monotonic() > self._expires):
+                # Only prices within the staleness budget; a quiet book must not keep old rates alive
+                prices = self.price_book.snapshot(self.max_age)
+                matrix = ConversionMatrix(account_currency, prices)
+                self._matrix = matrix
+                self._version = version
+                self._expires = min((price['received'] for price in prices.values()), default=float('inf')) + self.max_age
+            return matrix
+
+    def rate(self, currency, account_currency):
+        return self.matrix(account_currency).rate(currency)
+
+    def to_account(self, amount, currency, account_currency):
+        return self.matrix(account_currency).to_account(amount, currency)
@@ -5,6 +5,9 @@ import logging
 from datetime import datetime
 from models import db, Signal
 from config import Config
+from instrument_registry import instrument_registry
+from signal_bus import signal_bus
+from persistence_writer import persistence_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -52,11 +55,12 @@ class DiscordSignalFetcher:
                         lot_size=signal_data.get('lot_size'),
                         strategy=signal_data.get('strategy'),
                         confidence=signal_data.get('confidence'),
+                        source='DISCORD',
                         raw_message=message.content
                     )
                     
-                    db.session.add(signal)
-                    db.session.commit()
+                    # Group-committed off the event loop; execution starts once the row is durable
+                    persistence_writer.add(signal).add_done_callback(_publish_stored_signal)
                     
                     logger.info(f"New signal processed: {signal_data['symbol']} {signal_data['action']}")
                     
@@ -83,14 +87,14 @@ class DiscordSignalFetcher:
             buy_match = re.search(patterns['buy_pattern'], message_upper)
             if buy_match:
                 signal_data['action'] = 'BUY'
-                signal_data['symbol'] = buy_match.group(1)
+                signal_data['symbol'] = instrument_registry.resolve(buy_match.group(1)) or buy_match.group(1)
                 signal_data['entry_price'] = float(buy_match.group(2))
             
             # Check for SELL signal
             sell_match = re.search(patterns['sell_pattern'], message_upper)
             if sell_match:
                 signal_data['action'] = 'SELL'
-                signal_data['symbol'] = sell_match.group(1)
+                signal_data['symbol'] = instrument_registry.resolve(sell_match.group(1)) or sell_match.group(1)
                 signal_data['entry_price'] = float(sell_match.group(2))
             
             # Extract stop loss
@@ -142,6 +146,10 @@ class DiscordSignalFetcher:
         """Stop the Discord bot"""
         await self.client.close()
 
+def _publish_stored_signal(future):
+    if not future.exception():
+        signal_bus.publish(future.result().id)
+
 # Alternative simple signal fetcher for testing without Discord bot
 class SimpleSignalFetcher:
     def __init__(self, app):
@@ -159,12 +167,14 @@ class SimpleSignalFetcher:
                 take_profit=take_profit,
                 lot_size=Config.DEFAULT_LOT_SIZE,
                 strategy='TEST',
+                source='TEST',
                 confidence=0.8,
                 raw_message=f"Test signal: {action} {symbol} @ {entry_price}"
             )
             
             db.session.add(signal)
             db.session.commit()
+            signal_bus.publish(signal.id)
             
             logger.info(f"Test signal added: {action} {symbol} @ {entry_price}")
             return signal
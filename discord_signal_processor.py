@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from app import create_app
 from models import Signal, db, TradingSettings
 from config import Config
+from instrument_registry import instrument_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ def process_discord_signal(signal_text):
     """Process a Discord signal and add it to the database"""
     try:
         # Create Flask app
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # Parse the signal
@@ -41,6 +42,7 @@ def process_discord_signal(signal_text):
                 take_profit=signal_data['take_profit'],
                 lot_size=signal_data.get('lot_size', Config.DEFAULT_LOT_SIZE),
                 strategy='DISCORD_SIGNAL',
+                source='MANUAL',
                 raw_message=signal_text,
                 processed=False,
                 timestamp=datetime.utcnow()
@@ -76,20 +78,7 @@ def parse_signal(signal_text):
             return None
         
         # Extract symbol
-        symbols = [
-            'EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'USD_CAD',
-            'NZD_USD', 'USD_CHF', 'EUR_GBP', 'EUR_JPY', 'GBP_JPY',
-            'AUD_JPY', 'CAD_JPY', 'CHF_JPY', 'EUR_AUD', 'EUR_CAD',
-            'EUR_CHF', 'EUR_NZD', 'GBP_AUD', 'GBP_CAD', 'GBP_CHF',
-            'GBP_NZD', 'AUD_CAD', 'AUD_CHF', 'AUD_NZD', 'CAD_CHF',
-            'CAD_NZD', 'CHF_NZD', 'NZD_JPY'
-        ]
-        
-        symbol = None
-        for s in symbols:
-            if s in content:
-                symbol = s
-                break
+        symbol = instrument_registry.find_in_text(content)
         
         if not symbol:
             return None
@@ -162,7 +151,7 @@ def main():
                 print(f"✅ {message}")
                 
                 # Check auto trading status
-                app = create_app()
+                app = create_app(start_executor=False)
                 with app.app_context():
                     settings = TradingSettings.query.first()
                     auto_trading = settings.auto_trading_enabled if settings else True
@@ -56,6 +56,15 @@ def main():
         print(f"✅ Successfully closed: {result['closed']} trades")
         print(f"❌ Failed to close: {result['failed']} trades")
         
+        for trade_result in result.get('results', []):
+            if trade_result['status'] == 'CLOSED':
+                print(f"   ✅ {trade_result['trade_id']} {trade_result['instrument']} @ {trade_result['close_price']} (P&L {trade_result['pnl']:.2f})")
+            else:
+                print(f"   ❌ {trade_result['trade_id']} {trade_result['instrument']}: {trade_result['error']}")
+        
+        if result.get('elapsed') is not None:
+            print(f"⏱️  Total time: {result['elapsed']:.2f}s")
+        
         if result.get('error'):
             print(f"⚠️  Error: {result['error']}")
         
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Equity History
+This module rolls account snapshots up into 1m/1h/1d buckets and serves downsampled equity curves from them.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from models import AccountSnapshot, EquityRollup
+from persistence_writer import persistence_writer
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# (resolution, bucket seconds, source resolution or None for raw snapshots), finest first
+ROLLUPS = [('1m', 60, None), ('1h', 3600, '1m'), ('1d', 86400, '1h')]
+
+class EquityHistory:
+    """Incremental rollups plus range queries that read a bounded number of rows at any span"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def rollup(self):
+        """Roll new snapshots up through every resolution and prune expired detail (scheduler job)"""
+        try:
+            return persistence_writer.submit(self._rollup, datetime.utcnow()).result(timeout=Config.PERSISTENCE_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error rolling up equity history: {e}")
+            return None
+
+    def query(self, start, end, points=None):
+        """
+        Equity curve between start and end.
+
+        Args:
+            start (datetime): Range start (UTC)
+            end (datetime): Range end (UTC)
+            points (int): Maximum points to return
+
+        Returns:
+            dict: Resolution read and LTTB-downsampled points (timestamp, nav, balance, margin_used, unrealized_pnl)
+
+        Raises:
+            ValueError: If start is not before end or fewer than 3 points are asked for
+        """
+        points = Config.EQUITY_HISTORY_POINTS if points is None else points
+        if start >= end:
+            raise ValueError('start must be before end')
+        if points < 3:
+            raise ValueError('points must be at least 3')  # LTTB keeps both ends plus one point per bucket
+        resolution = self._resolution_for(start, end)
+
+        with self.app.app_context():
+            if resolution == 'raw':
+                rows = (AccountSnapshot.query
+                        .filter(AccountSnapshot.timestamp >= start, AccountSnapshot.timestamp <= end)
+                        .order_by(AccountSnapshot.timestamp).all())
+                series = [(row.timestamp, row.nav, row.balance, row.margin_used, row.unrealized_pnl) for row in rows]
+            else:
+                rows = (EquityRollup.query
+                        .filter(EquityRollup.resolution == resolution,
+                                EquityRollup.bucket >= start, EquityRollup.bucket <= end)
+                        .order_by(EquityRollup.bucket).all())
+                series = [(row.bucket, row.nav_close, row.balance, row.margin_used, row.unrealized_pnl) for row in rows]
+
+        sampled = lttb([(_epoch(row[0]), row[1], row) for row in series], points)
+        return {
+            'resolution': resolution,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'source_points': len(series),
+            'points': [{
+                'timestamp': row[0].isoformat(),
+                'nav': row[1],
+                'balance': row[2],
+                'margin_used': row[3],
+                'unrealized_pnl': row[4]
+            } for _, _, row in sampled]
+        }
+
+    def _resolution_for(self, start, end):
+        """Finest resolution that still has data for start and keeps the row count under the cap"""
+        span = (end - start).total_seconds()
+        age = (datetime.utcnow() - start).total_seconds()
+        candidates = [
+            ('raw', Config.JOB_ACCOUNT_INTERVAL, Config.EQUITY_SNAPSHOT_RETENTION_DAYS),
+            ('1m', 60, Config.EQUITY_MINUTE_RETENTION_DAYS),
+            ('1h', 3600, None)
+        ]
+        for resolution, step, retention_days in candidates:
+            if retention_days and age > retention_days * 86400:
+                continue
+            if span / step <= Config.EQUITY_HISTORY_MAX_SOURCE_POINTS:
+                return resolution
+        return '1d'
+
+    @staticmethod
+    def _rollup(session, now):
+        written = 0
+        for resolution, seconds, source in ROLLUPS:
+            # Re-aggregate the newest bucket too: it was probably still filling last time
+            last_bucket = (session.query(EquityRollup.bucket)
+                           .filter_by(resolution=resolution)
+                           .order_by(EquityRollup.bucket.desc()).limit(1).scalar())
+
+            if source is None:
+                query = session.query(AccountSnapshot).order_by(AccountSnapshot.timestamp)
+                if last_bucket:
+                    query = query.filter(AccountSnapshot.timestamp >= last_bucket)
+                rows = [(row.timestamp, row.nav, row.nav, row.nav, row.nav, row.balance,
+                         row.margin_used, row.unrealized_pnl, 1) for row in query]
+            else:
+                query = session.query(EquityRollup).filter_by(resolution=source).order_by(EquityRollup.bucket)
+                if last_bucket:
+                    query = query.filter(EquityRollup.bucket >= last_bucket)
+                rows = [(row.bucket, row.nav_open, row.nav_high, row.nav_low, row.nav_close, row.balance,
+                         row.margin_used, row.unrealized_pnl, row.samples) for row in query]
+
+            buckets = {}
+            for row in rows:
+                bucket = _floor(row[0], seconds)
+                current = buckets.get(bucket)
+                if current is None:
+                    buckets[bucket] = list(row[1:])
+                else:
+                    current[1] = max(current[1], row[2])
+                    current[2] = min(current[2], row[3])
+                    current[3:7] = row[4:8]
+                    current[7] += row[8]
+
+            for bucket, (nav_open, nav_high, nav_low, nav_close, balance, margin_used, unrealized_pnl, samples) in buckets.items():
+                session.merge(EquityRollup(
+                    resolution=resolution, bucket=bucket,
+                    nav_open=nav_open, nav_high=nav_high, nav_low=nav_low, nav_close=nav_close,
+                    balance=balance, margin_used=margin_used, unrealized_pnl=unrealized_pnl, samples=samples
+                ))
+            session.flush()
+            written += len(buckets)
+
+        # Detail older than its retention is covered by the coarser rollups
+        session.query(AccountSnapshot).filter(
+            AccountSnapshot.timestamp < now - timedelta(days=Config.EQUITY_SNAPSHOT_RETENTION_DAYS)
+        ).delete(synchronize_session=False)
+        session.query(EquityRollup).filter(
+            EquityRollup.resolution == '1m',
+            EquityRollup.bucket < now - timedelta(days=Config.EQUITY_MINUTE_RETENTION_DAYS)
+        ).delete(synchronize_session=False)
+        return written
+
+def lttb(points, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        points (list): (x, y, payload) tuples sorted by x
+        threshold (int): Number of points to keep
+
+    Returns:
+        list: The selected points, always including the first and last
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return points
+
+    sampled = [points[0]]
+    every = (count - 2) / (threshold - 2)
+    selected = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third corner of the triangle
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, count)
+        next_points = points[next_start:next_end] or points[-1:]
+        avg_x = sum(point[0] for point in next_points) / len(next_points)
+        avg_y = sum(point[1] for point in next_points) / len(next_points)
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = points[selected][0], points[selected][1]
+
+        best, best_area = start, -1
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (points[j][1] - ay) - (ax - points[j][0]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        sampled.append(points[best])
+        selected = best
+
+    sampled.append(points[-1])
+    return sampled
+
+def parse_utc(value):
+    """Parse an ISO 8601 timestamp into the naive UTC datetimes the tables store (Z or an offset is converted)"""
+    timestamp = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith(('Z', 'z')) else value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def _epoch(timestamp):
+    return (timestamp - EPOCH).total_seconds()
+
+def _floor(timestamp, seconds):
+    return EPOCH + timedelta(seconds=int(_epoch(timestamp) // seconds * seconds))
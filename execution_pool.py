@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Execution Pool
+This module runs orders for different instruments in parallel while keeping FIFO order within each instrument.
+"""
+
+import queue
+import threading
+import time
+import logging
+from collections import deque
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ExecutionPool:
+    """Worker pool with one FIFO lane per key; a lane is only ever served by one worker at a time"""
+
+    def __init__(self, workers=None, latency_window=1000):
+        self.workers = workers or Config.EXECUTION_WORKERS
+        self._lanes = {}            # key -> deque of (submitted_at, func, args)
+        self._ready = queue.Queue() # keys with queued work and no worker on them
+        self._lock = threading.Lock()
+        self._threads = []
+        self._wait_times = deque(maxlen=latency_window)
+        self._run_times = deque(maxlen=latency_window)
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._active = 0
+
+    def start(self):
+        """Start the worker threads"""
+        if self._threads:
+            return
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"execution-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Execution pool started with {self.workers} workers")
+
+    def submit(self, key, func, *args):
+        """
+        Queue work behind everything already queued for the same key.
+
+        Args:
+            key (str): Ordering key, normally the instrument
+            func (callable): Work to run
+            *args: Arguments for func
+        """
+        with self._lock:
+            lane = self._lanes.get(key)
+            idle = lane is None
+            if idle:
+                lane = self._lanes[key] = deque()
+            lane.append((time.monotonic(), func, args))
+            self._submitted += 1
+
+        # A lane that already exists is either in the ready queue or held by a worker
+        if idle:
+            self._ready.put(key)
+
+    def get_metrics(self):
+        """Queue depth per instrument plus wait and run time percentiles in milliseconds"""
+        with self._lock:
+            depths = {key: len(lane) for key, lane in self._lanes.items() if lane}
+            wait_times = sorted(self._wait_times)
+            run_times = sorted(self._run_times)
+            metrics = {
+                'workers': self.workers,
+                'active': self._active,
+                'queue_depth': sum(depths.values()),
+                'queue_depth_by_key': depths,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed
+            }
+
+        for label, values in (('wait', wait_times), ('run', run_times)):
+            for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+                index = min(len(values) - 1, int(fraction * len(values)))
+                metrics[f'{label}_{name}_ms'] = round(values[index] * 1000, 1) if values else None
+            metrics[f'{label}_max_ms'] = round(values[-1] * 1000, 1) if values else None
+
+        return metrics
+
+    def _worker(self):
+        while True:
+            key = self._ready.get()
+
+            with self._lock:
+                submitted_at, func, args = self._lanes[key].popleft()
+                self._active += 1
+
+            start = time.monotonic()
+            failed = False
+            try:
+                func(*args)
+            except Exception as e:
+                failed = True
+                logger.error(f"Execution for {key} failed: {e}")
+            finished = time.monotonic()
+
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                if failed:
+                    self._failed += 1
+                self._wait_times.append(start - submitted_at)
+                self._run_times.append(finished - start)
+
+                # Hand the lane back (behind other instruments) or retire it
+                requeue = bool(self._lanes[key])
+                if not requeue:
+                    del self._lanes[key]
+
+            if requeue:
+                self._ready.put(key)
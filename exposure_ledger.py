@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Exposure Ledger
+This module tracks open trades, net units and margin in memory so pre-trade risk checks need no I/O.
+"""
+
+import threading
+import logging
+from collections import defaultdict
+from datetime import datetime
+from instrument_registry import instrument_registry
+
+logger = logging.getLogger(__name__)
+
+class ExposureLedger:
+    """Open exposure updated on fills and closes, resynced periodically from OANDA"""
+
+    def __init__(self, converter=None):
+        self.converter = converter  # CurrencyConverter for quote -> account currency amounts
+        self.trades = {}  # trade_id -> {'instrument', 'units', 'price', 'margin'}
+        self.instrument_units = defaultdict(float)
+        self.currency_units = defaultdict(float)
+        self.margin_used = 0.0
+        self.reserved = 0
+        self.nav = None
+        self.account_currency = 'USD'
+        self.max_concurrent_trades = None
+        self.risk_per_trade = None
+        self.last_sync = None
+        self._lock = threading.Lock()
+
+    def set_limits(self, max_concurrent_trades, risk_per_trade):
+        with self._lock:
+            self.max_concurrent_trades = max_concurrent_trades
+            self.risk_per_trade = risk_per_trade
+
+    def reserve(self, instrument, units, price, stop_loss):
+        """
+        Check an order against the limits and hold a slot for it.
+
+        Args:
+            instrument (str): OANDA instrument
+            units (int): Signed order units
+            price (float): Expected fill price
+            stop_loss (float): Stop loss price
+
+        Returns:
+            tuple: (allowed, reason); an allowed order must be followed by open() or release()
+        """
+        risk = self.to_account_currency(abs(units) * abs(price - stop_loss), instrument) if stop_loss else None
+
+        with self._lock:
+            open_count = len(self.trades) + self.reserved
+            if self.max_concurrent_trades is not None and open_count >= self.max_concurrent_trades:
+                return False, f"{open_count} trades open or pending (max {self.max_concurrent_trades})"
+
+            if self.risk_per_trade is not None and self.nav and risk is not None:
+                risk_percent = round(risk / self.nav * 100, 4)  # Sized-to-the-limit orders must not fail on float noise
+                if risk_percent > self.risk_per_trade:
+                    return False, f"risk {risk_percent:.2f}% of NAV exceeds {self.risk_per_trade}% per trade"
+
+            self.reserved += 1
+            return True, None
+
+    def release(self):
+        """Give back a reservation whose order did not fill"""
+        with self._lock:
+            self.reserved = max(0, self.reserved - 1)
+
+    def open(self, trade_id, instrument, units, price, margin=None, reserved=False):
+        """Record a newly opened trade (ignored if already known)"""
+        if margin is None:
+            margin = self.to_account_currency(abs(units) * price, instrument) * instrument_registry.margin_rate(instrument)
+
+        with self._lock:
+            if reserved:
+                self.reserved = max(0, self.reserved - 1)
+            if trade_id in self.trades:
+                return
+            self._add(trade_id, instrument, units, price, margin)
+
+    def reduce(self, trade_id, units):
+        """Apply a partial close; units is the signed change (opposite sign to the trade)"""
+        with self._lock:
+            trade = self.trades.get(trade_id)
+            if not trade:
+                return
+            self._remove(trade_id)
+            remaining = trade['units'] + units
+            if remaining:
+                margin = trade['margin'] * remaining / trade['units']
+                self._add(trade_id, trade['instrument'], remaining, trade['price'], margin)
+
+    def close(self, trade_id):
+        """Remove a closed trade (ignored if unknown)"""
+        with self._lock:
+            if trade_id in self.trades:
+                self._remove(trade_id)
+
+    def resync(self, open_trades, summary):
+        """
+        Replace the ledger with OANDA's view of the account.
+
+        Args:
+            open_trades (list): OANDA trade dicts (id, instrument, currentUnits, price, marginUsed)
+            summary (dict): Account summary with NAV, marginUsed and currency
+        """
+        with self._lock:
+            self.trades = {}
+            self.instrument_units = defaultdict(float)
+            self.currency_units = defaultdict(float)
+            self.margin_used = 0.0
+            for trade in open_trades:
+                self._add(trade['id'], trade['instrument'], float(trade['currentUnits']),
+                          float(trade['price']), float(trade.get('marginUsed', 0)))
+
+            if 'marginUsed' in summary:
+                self.margin_used = float(summary['marginUsed'])
+            if 'NAV' in summary:
+                self.nav = float(summary['NAV'])
+            self.account_currency = summary.get('currency', self.account_currency)
+            self.last_sync = datetime.utcnow()
+
+    def to_account_currency(self, amount, instrument):
+        """Convert an amount in the instrument's quote currency to the account currency"""
+        quote = instrument.partition('_')[2]
+        if quote == self.account_currency:
+            return amount
+
+        converted = self.converter.to_account(amount, quote, self.account_currency) if self.converter else None
+        if converted is None:
+            logger.debug(f"No conversion rate from {quote} to {self.account_currency}")
+            return amount
+        return converted
+
+    def get_snapshot(self):
+        with self._lock:
+            return {
+                'open_trades': len(self.trades),
+                'reserved': self.reserved,
+                'margin_used': round(self.margin_used, 2),
+                'nav': self.nav,
+                'account_currency': self.account_currency,
+                'max_concurrent_trades': self.max_concurrent_trades,
+                'risk_per_trade': self.risk_per_trade,
+                'instrument_units': {k: v for k, v in self.instrument_units.items() if v},
+                'currency_units': {k: round(v, 2) for k, v in self.currency_units.items() if round(v, 2)},
+                'last_sync': self.last_sync.isoformat() if self.last_sync else None
+            }
+
+    def _add(self, trade_id, instrument, units, price, margin):
+        self.trades[trade_id] = {'instrument': instrument, 'units': units, 'price': price, 'margin': margin}
+        base, _, quote = instrument.partition('_')
+        self.instrument_units[instrument] += units
+        self.currency_units[base] += units
+        self.currency_units[quote] -= units * price
+        self.margin_used += margin
+
+    def _remove(self, trade_id):
+        trade = self.trades.pop(trade_id)
+        base, _, quote = trade['instrument'].partition('_')
+        self.instrument_units[trade['instrument']] -= trade['units']
+        self.currency_units[base] -= trade['units']
+        self.currency_units[quote] += trade['units'] * trade['price']
+        self.margin_used -= trade['margin']
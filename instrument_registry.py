@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Instrument Registry
+This module loads OANDA instrument metadata once, caches it on disk and resolves symbol aliases in O(1).
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import logging
+import oandapyV20.endpoints.accounts as accounts
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Used until the account's instrument list has been fetched
+DEFAULT_INSTRUMENTS = [
+    'EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'USD_CAD',
+    'NZD_USD', 'USD_CHF', 'EUR_GBP', 'EUR_JPY', 'GBP_JPY',
+    'AUD_JPY', 'CAD_JPY', 'CHF_JPY', 'EUR_AUD', 'EUR_CAD',
+    'EUR_CHF', 'EUR_NZD', 'GBP_AUD', 'GBP_CAD', 'GBP_CHF',
+    'GBP_NZD', 'AUD_CAD', 'AUD_CHF', 'AUD_NZD', 'CAD_CHF',
+    'NZD_CAD', 'NZD_CHF', 'NZD_JPY', 'XAU_USD', 'XAG_USD'
+]
+
+# Names traders use that are not derivable from the instrument name
+EXTRA_ALIASES = {
+    'GOLD': 'XAU_USD',
+    'SILVER': 'XAG_USD'
+}
+
+# Candidate symbol tokens in free text: EURUSD, EUR/USD, EUR_USD, GOLD, US30_USD...
+SYMBOL_TOKEN_PATTERN = re.compile(r'[A-Z0-9]+(?:[_/\-][A-Z0-9]+)?')
+
+def _default_instrument(name):
+    base, quote = name.split('_')
+    if base in ('XAU', 'XAG'):
+        return {'name': name, 'type': 'METAL', 'displayName': f"{base}/{quote}",
+                'pipLocation': -2, 'displayPrecision': 3, 'minimumTradeSize': '1', 'marginRate': '0.05'}
+    jpy = quote == 'JPY'
+    return {'name': name, 'type': 'CURRENCY', 'displayName': f"{base}/{quote}",
+            'pipLocation': -2 if jpy else -4, 'displayPrecision': 3 if jpy else 5,
+            'minimumTradeSize': '1', 'marginRate': '0.02'}
+
+class InstrumentRegistry:
+    """Instrument metadata (pip location, precision, min size, margin rate) with an alias index"""
+
+    def __init__(self, cache_path=None, ttl=None):
+        self.cache_path = cache_path or Config.INSTRUMENT_CACHE_PATH
+        self.ttl = ttl if ttl is not None else Config.INSTRUMENT_CACHE_TTL
+        self._instruments = {}
+        self._aliases = {}
+        self._lock = threading.Lock()
+
+        self._set_instruments([_default_instrument(name) for name in DEFAULT_INSTRUMENTS])
+
+        # Any cached list beats the defaults, however old
+        cached = self._read_cache()
+        if cached:
+            self._set_instruments(cached['instruments'])
+
+    def load(self, client, account_id):
+        """Load instruments from the disk cache, or from AccountInstruments when the cache has expired"""
+        cached = self._read_cache()
+        if cached and time.time() - cached['fetched_at'] < self.ttl:
+            self._set_instruments(cached['instruments'])
+            return
+
+        try:
+            r = accounts.AccountInstruments(accountID=account_id)
+            response = client.request(r)
+
+            instruments = [
+                {key: instrument.get(key) for key in
+                 ('name', 'type', 'displayName', 'pipLocation', 'displayPrecision', 'minimumTradeSize', 'marginRate')}
+                for instrument in response['instruments']
+            ]
+            self._set_instruments(instruments)
+            self._write_cache(instruments)
+            logger.info(f"Loaded {len(instruments)} instruments from OANDA")
+
+        except Exception as e:
+            logger.error(f"Error loading instruments, using cached metadata: {e}")
+
+    def resolve(self, symbol):
+        """Map any known spelling (EURUSD, EUR/USD, eur_usd, GOLD) to the OANDA instrument name"""
+        if not symbol:
+            return None
+        return self._aliases.get(symbol.strip().upper())
+
+    def find_in_text(self, text):
+        """Get the first instrument mentioned in free text, or None"""
+        for token in SYMBOL_TOKEN_PATTERN.findall(text.upper()):
+            instrument = self._aliases.get(token)
+            if instrument:
+                return instrument
+        return None
+
+    def get(self, symbol):
+        instrument = self.resolve(symbol)
+        return self._instruments.get(instrument) if instrument else None
+
+    def display_precision(self, symbol, default=5):
+        instrument = self.get(symbol)
+        return int(instrument['displayPrecision']) if instrument else default
+
+    def pip_location(self, symbol, default=-4):
+        instrument = self.get(symbol)
+        return int(instrument['pipLocation']) if instrument else default
+
+    def pip_size(self, symbol):
+        return 10 ** self.pip_location(symbol)
+
+    def min_trade_size(self, symbol, default=1.0):
+        instrument = self.get(symbol)
+        return float(instrument['minimumTradeSize']) if instrument else default
+
+    def margin_rate(self, symbol, default=0.02):
+        instrument = self.get(symbol)
+        return float(instrument['marginRate']) if instrument else default
+
+    def names(self):
+        return list(self._instruments)
+
+    def _set_instruments(self, instruments):
+        by_name = {}
+        aliases = {}
+        for instrument in instruments:
+            name = instrument['name']
+            by_name[name] = instrument
+            aliases[name] = name
+            aliases[name.replace('_', '')] = name
+            aliases[name.replace('_', '/')] = name
+            aliases[name.replace('_', '-')] = name
+            if instrument.get('displayName'):
+                aliases[instrument['displayName'].upper()] = name
+
+        for alias, name in EXTRA_ALIASES.items():
+            if name in by_name:
+                aliases[alias] = name
+
+        # Swap both maps in at once so readers never see a half-built index
+        with self._lock:
+            self._instruments = by_name
+            self._aliases = aliases
+
+    def _read_cache(self):
+        try:
+            if not os.path.exists(self.cache_path):
+                return None
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable instrument cache {self.cache_path}: {e}")
+            return None
+
+    def _write_cache(self, instruments):
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'fetched_at': time.time(), 'instruments': instruments}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write instrument cache {self.cache_path}: {e}")
+
+# Global instance for easy use
+instrument_registry = InstrumentRegistry()
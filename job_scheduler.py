@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Job Scheduler
+This module runs maintenance jobs on independent cadences with jitter, timeouts and overlap protection.
+"""
+
+import random
+import threading
+import time
+import logging
+from datetime import datetime
+import schedule
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    """A periodic task and its run statistics"""
+
+    def __init__(self, name, func, interval, jitter=0.0, timeout=None, when=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.when = when
+        self.running = False
+        self.started_at = None
+        self.timed_out = False
+        self.runs = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_lag = None
+        self.last_error = None
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'jitter': self.jitter,
+            'timeout': self.timeout,
+            'running': self.running,
+            'runs': self.runs,
+            'skipped': self.skipped,
+            'timeouts': self.timeouts,
+            'failures': self.failures,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_duration_ms': round(self.last_duration * 1000, 1) if self.last_duration is not None else None,
+            'last_lag_ms': round(self.last_lag * 1000, 1) if self.last_lag is not None else None,
+            'last_error': self.last_error
+        }
+
+class JobScheduler:
+    """Drives a schedule.Scheduler; every job runs on its own thread so one slow call never delays the rest"""
+
+    def __init__(self, tick=0.1):
+        self.scheduler = schedule.Scheduler()
+        self.jobs = {}
+        self.tick = tick
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_job(self, name, func, interval, jitter=0.0, timeout=None, when=None):
+        """
+        Register a periodic job.
+
+        Args:
+            name (str): Unique job name
+            func (callable): Work to run
+            interval (float): Seconds between runs
+            jitter (float): Random start delay of up to this many seconds
+            timeout (float, optional): Runs longer than this are reported as timed out
+            when (callable, optional): Runs are skipped while this returns False
+        """
+        job = Job(name, func, interval, jitter, timeout, when)
+        self.jobs[name] = job
+        job.schedule_job = self.scheduler.every(interval).seconds.do(self._dispatch, job)
+        return job
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='job-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Job scheduler started with jobs: {', '.join(self.jobs)}")
+
+    def stop(self):
+        """Stop dispatching jobs; runs already in progress finish on their own"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def run_now(self, name):
+        """Trigger a job immediately (still subject to overlap protection)"""
+        self._dispatch(self.jobs[name], scheduled=False)
+
+    def get_stats(self):
+        with self._lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scheduler.run_pending()
+                self._check_timeouts()
+            except Exception as e:
+                logger.error(f"Error in job scheduler: {e}")
+            self._stop.wait(self.tick)
+
+    def _dispatch(self, job, scheduled=True):
+        """Start a job run unless it is switched off or the previous run is still going"""
+        if job.when and not job.when():
+            return
+
+        # While schedule runs this callback, next_run still holds the time it was due
+        lag = max(0.0, (datetime.now() - job.schedule_job.next_run).total_seconds()) if scheduled else 0.0
+
+        with self._lock:
+            if job.running:
+                job.skipped += 1
+                return
+            job.running = True
+            job.timed_out = False
+            job.started_at = time.monotonic()
+
+        threading.Thread(target=self._execute, args=(job, lag), name=f"job-{job.name}", daemon=True).start()
+
+    def _execute(self, job, lag):
+        if job.jitter:
+            time.sleep(random.uniform(0, job.jitter))
+
+        start = time.monotonic()
+        error = None
+        try:
+            job.func()
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Job {job.name} failed: {e}")
+
+        with self._lock:
+            job.running = False
+            job.runs += 1
+            job.last_run = datetime.utcnow()
+            job.last_duration = time.monotonic() - start
+            job.last_lag = lag
+            job.last_error = error
+            if error:
+                job.failures += 1
+
+    def _check_timeouts(self):
+        now = time.monotonic()
+        with self._lock:
+            for job in self.jobs.values():
+                if job.running and job.timeout and not job.timed_out and now - job.started_at > job.timeout:
+                    job.timed_out = True
+                    job.timeouts += 1
+                    logger.warning(f"Job {job.name} has been running for more than {job.timeout}s")
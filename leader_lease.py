@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Leader Lease
+This module elects a single executor process through a lease row in the shared database.
+"""
+
+import os
+import time
+import uuid
+import socket
+import threading
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+from models import db, LeaderLease
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def make_owner_id():
+    """Identity of this process for leases and claims: host:pid:nonce"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class LeaderElector:
+    """Holds or waits for a named lease; calls on_elected/on_revoked as leadership changes"""
+
+    def __init__(self, app, name='executor', ttl=None, on_elected=None, on_revoked=None, owner=None):
+        self.app = app
+        self.name = name
+        self.ttl = ttl or Config.LEADER_LEASE_TTL
+        self.owner = owner or make_owner_id()
+        self.on_elected = on_elected
+        self.on_revoked = on_revoked
+        self._leader = False
+        self._deadline = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the election thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"Leader election for '{self.name}' started as {self.owner}")
+
+    def stop(self):
+        """Stop campaigning and hand the lease back"""
+        self._stop.set()
+        if self._leader:
+            self._set_leader(False)
+            self.release()
+
+    @property
+    def is_leader(self):
+        # Trust our own lease only until it would have expired, even if renewals are failing
+        return self._leader and time.monotonic() < self._deadline
+
+    def try_acquire(self):
+        """
+        Take or renew the lease.
+
+        Returns:
+            bool: True if this process holds the lease
+        """
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        started = time.monotonic()
+
+        try:
+            with self.app.app_context():
+                # Conditional update: renew our own lease or take over an expired one
+                result = db.session.execute(
+                    update(LeaderLease)
+                    .where(LeaderLease.name == self.name)
+                    .where(or_(LeaderLease.owner == self.owner, LeaderLease.expires_at < now))
+                    .values(owner=self.owner, expires_at=expires_at)
+                )
+                acquired = result.rowcount == 1
+                if acquired and not self._leader:
+                    db.session.execute(
+                        update(LeaderLease).where(LeaderLease.name == self.name).values(acquired_at=now)
+                    )
+                db.session.commit()
+
+                if not acquired and not db.session.get(LeaderLease, self.name):
+                    # First process ever: the primary key makes concurrent inserts race safely
+                    db.session.add(LeaderLease(name=self.name, owner=self.owner, expires_at=expires_at, acquired_at=now))
+                    try:
+                        db.session.commit()
+                        acquired = True
+                    except IntegrityError:
+                        db.session.rollback()
+
+        except Exception as e:
+            logger.error(f"Error renewing leader lease '{self.name}': {e}")
+            return self.is_leader
+
+        if acquired:
+            self._deadline = started + self.ttl
+        return acquired
+
+    def release(self):
+        """Expire our lease so a standby can take over immediately"""
+        try:
+            with self.app.app_context():
+                db.session.execute(
+                    update(LeaderLease)
+                    .where(LeaderLease.name == self.name, LeaderLease.owner == self.owner)
+                    .values(expires_at=datetime.utcnow())
+                )
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Error releasing leader lease '{self.name}': {e}")
+
+    def get_status(self):
+        status = {'name': self.name, 'owner': self.owner, 'is_leader': self.is_leader, 'ttl': self.ttl}
+        try:
+            with self.app.app_context():
+                lease = db.session.get(LeaderLease, self.name)
+                status['lease'] = lease.to_dict() if lease else None
+        except Exception as e:
+            logger.error(f"Error reading leader lease '{self.name}': {e}")
+        return status
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._set_leader(self.try_acquire())
+            # Renew well inside the TTL so one slow round trip never costs the lease
+            self._stop.wait(self.ttl / 3)
+
+    def _set_leader(self, leader):
+        if leader == self._leader:
+            return
+
+        self._leader = leader
+        callback = self.on_elected if leader else self.on_revoked
+        logger.info(f"{self.owner} {'acquired' if leader else 'lost'} leadership of '{self.name}'")
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in leadership callback for '{self.name}': {e}")
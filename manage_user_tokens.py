@@ -229,7 +229,7 @@ def main():
     
     try:
         # Create Flask app context
-        app = create_app()
+        app = create_app(start_executor=False)
         
         while True:
             show_menu()
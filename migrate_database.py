@@ -25,7 +25,7 @@ def migrate_database():
             print("❌ Database file not found. Creating new database...")
             from app import create_app
             from models import db
-            app = create_app()
+            app = create_app(start_executor=False)
             with app.app_context():
                 db.create_all()
             print("✅ New database created successfully!")
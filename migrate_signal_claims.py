@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Signal Claims Migration Script
+This script adds the claim columns (status, claim_owner, claim_expires_at) to the signal table.
+"""
+
+import os
+import sys
+import sqlite3
+import logging
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate_database():
+    """Add claim columns to the signal table and backfill status"""
+    try:
+        # Database file path
+        db_path = 'instance/trading_bot.db'
+
+        if not os.path.exists(db_path):
+            print("❌ Database file not found. Start the bot once to create it.")
+            return False
+
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("PRAGMA table_info(signal)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        new_columns = {
+            'status': "ALTER TABLE signal ADD COLUMN status VARCHAR(20) DEFAULT 'NEW'",
+            'claim_owner': "ALTER TABLE signal ADD COLUMN claim_owner VARCHAR(100)",
+            'claim_expires_at': "ALTER TABLE signal ADD COLUMN claim_expires_at DATETIME"
+        }
+        missing_columns = [col for col in new_columns if col not in columns]
+
+        for column in missing_columns:
+            cursor.execute(new_columns[column])
+            print(f"✅ Added column: {column}")
+
+        # Signals handled before claims existed count as filled
+        cursor.execute("UPDATE signal SET status = 'FILLED' WHERE processed = 1 AND (status IS NULL OR status = 'NEW')")
+        print(f"✅ Marked {cursor.rowcount} processed signals as FILLED")
+        cursor.execute("UPDATE signal SET status = 'NEW' WHERE status IS NULL")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_signal_status ON signal (status)")
+
+        conn.commit()
+        conn.close()
+
+        print("✅ Signal claims migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        logger.error(f"Signal claims migration error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🔄 Signal Claims Migration")
+    print("=" * 50)
+    success = migrate_database()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Signal Source Migration Script
+This script adds the source column to the signal table, backfills it and creates the hot query indexes.
+"""
+
+import os
+import sys
+import sqlite3
+import logging
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Message ID prefixes written by each signal producer; anything unprefixed is a Discord message ID
+SOURCE_PREFIXES = {
+    'STRATEGY': 'strategy',
+    'TRADINGVIEW': 'tradingview',
+    'MANUAL': 'manual',
+    'TEST': 'test',
+    'DISCORD': 'discord'
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_signal_pending ON signal (source, timestamp) WHERE processed = 0",
+    "CREATE INDEX IF NOT EXISTS ix_trade_status_symbol ON trade (status, symbol)",
+    "CREATE INDEX IF NOT EXISTS ix_trade_strategy_status ON trade (strategy, status)"
+]
+
+def migrate_database():
+    """Add and backfill signal.source, then create the composite and partial indexes"""
+    try:
+        # Database file path
+        db_path = 'instance/trading_bot.db'
+
+        if not os.path.exists(db_path):
+            print("❌ Database file not found. Start the bot once to create it.")
+            return False
+
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("PRAGMA table_info(signal)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        if 'source' not in columns:
+            cursor.execute("ALTER TABLE signal ADD COLUMN source VARCHAR(11)")
+            print("✅ Added column: source")
+
+        for source, prefix in SOURCE_PREFIXES.items():
+            cursor.execute(
+                "UPDATE signal SET source = ? WHERE source IS NULL AND discord_message_id LIKE ? ESCAPE '\\'",
+                (source, f"{prefix}\\_%")
+            )
+            print(f"✅ Marked {cursor.rowcount} signals as {source}")
+
+        # Prefixes from other manual inputs, then plain Discord message IDs
+        cursor.execute("UPDATE signal SET source = 'MANUAL' WHERE source IS NULL AND discord_message_id LIKE '%\\_%' ESCAPE '\\'")
+        cursor.execute("UPDATE signal SET source = 'DISCORD' WHERE source IS NULL")
+        print(f"✅ Marked {cursor.rowcount} Discord message IDs as DISCORD")
+
+        for statement in INDEXES:
+            cursor.execute(statement)
+        print(f"✅ Created {len(INDEXES)} indexes")
+
+        cursor.execute("ANALYZE")
+
+        conn.commit()
+        conn.close()
+
+        print("✅ Signal source migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        logger.error(f"Signal source migration error: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("🔄 Signal Source Migration")
+    print("=" * 50)
+    success = migrate_database()
+    sys.exit(0 if success else 1)
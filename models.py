@@ -4,7 +4,24 @@ import json
 
 db = SQLAlchemy()
 
+# Where a signal came from; STRATEGY signals are generated internally and never auto-executed
+SIGNAL_SOURCES = ('DISCORD', 'TRADINGVIEW', 'MANUAL', 'TEST', 'STRATEGY')
+EXTERNAL_SIGNAL_SOURCES = ('DISCORD', 'TRADINGVIEW', 'MANUAL', 'TEST')
+
+def signal_source_for(message_id):
+    """Source implied by a message ID prefix (plain Discord message IDs have none)"""
+    prefix, sep, _ = message_id.partition('_')
+    if not sep:
+        return 'DISCORD'
+    return prefix.upper() if prefix.upper() in SIGNAL_SOURCES else 'MANUAL'
+
 class Signal(db.Model):
+    __table_args__ = (
+        # Only unprocessed rows are indexed, so the sweep's lookups stay flat as history grows
+        db.Index('ix_signal_pending', 'source', 'timestamp',
+                 sqlite_where=db.text('processed = 0'), postgresql_where=db.text('NOT processed')),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     discord_message_id = db.Column(db.String(50), unique=True, nullable=False)
     symbol = db.Column(db.String(20), nullable=False)
@@ -16,8 +33,13 @@ class Signal(db.Model):
     strategy = db.Column(db.String(50), nullable=True)
     confidence = db.Column(db.Float, nullable=True)
     raw_message = db.Column(db.Text, nullable=False)
+    source = db.Column(db.Enum(*SIGNAL_SOURCES, name='signal_source', native_enum=False), nullable=False,
+                       default=lambda context: signal_source_for(context.get_current_parameters()['discord_message_id']))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    processed = db.Column(db.Boolean, default=False)
+    processed = db.Column(db.Boolean, default=False)  # Kept in step with status for existing readers
+    status = db.Column(db.String(20), default='NEW', index=True)  # NEW, CLAIMED, SUBMITTED, FILLED, FAILED
+    claim_owner = db.Column(db.String(100), nullable=True)  # Executor holding the claim
+    claim_expires_at = db.Column(db.DateTime, nullable=True)
     
     def to_dict(self):
         return {
@@ -30,11 +52,18 @@ class Signal(db.Model):
             'lot_size': self.lot_size,
             'strategy': self.strategy,
             'confidence': self.confidence,
+            'source': self.source,
             'timestamp': self.timestamp.isoformat(),
-            'processed': self.processed
+            'processed': self.processed,
+            'status': self.status
         }
 
 class Trade(db.Model):
+    __table_args__ = (
+        db.Index('ix_trade_status_symbol', 'status', 'symbol'),
+        db.Index('ix_trade_strategy_status', 'strategy', 'status'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     oanda_trade_id = db.Column(db.String(50), unique=True, nullable=False)
     signal_id = db.Column(db.Integer, db.ForeignKey('signal.id'), nullable=True)
@@ -124,6 +153,26 @@ class Account(db.Model):
             'timestamp': self.timestamp.isoformat()
         }
 
+class AccountSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)  # Append-only, one per refresh
+    balance = db.Column(db.Float, nullable=False)
+    nav = db.Column(db.Float, nullable=False)
+    margin_used = db.Column(db.Float, default=0.0)
+    unrealized_pnl = db.Column(db.Float, default=0.0)
+
+class EquityRollup(db.Model):
+    resolution = db.Column(db.String(2), primary_key=True)  # 1m, 1h, 1d
+    bucket = db.Column(db.DateTime, primary_key=True)  # Bucket start (UTC)
+    nav_open = db.Column(db.Float, nullable=False)  # Other values are as of the bucket's last snapshot
+    nav_high = db.Column(db.Float, nullable=False)
+    nav_low = db.Column(db.Float, nullable=False)
+    nav_close = db.Column(db.Float, nullable=False)
+    balance = db.Column(db.Float, nullable=False)
+    margin_used = db.Column(db.Float, default=0.0)
+    unrealized_pnl = db.Column(db.Float, default=0.0)
+    samples = db.Column(db.Integer, default=0)
+
 class Strategy(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
@@ -258,4 +307,30 @@ class OANDAConfig(db.Model):
             'last_used': self.last_used.isoformat() if self.last_used else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class LeaderLease(db.Model):
+    name = db.Column(db.String(50), primary_key=True)  # Role the lease grants, e.g. 'executor'
+    owner = db.Column(db.String(100), nullable=False)  # host:pid:nonce of the holder
+    expires_at = db.Column(db.DateTime, nullable=False)
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'owner': self.owner,
+            'expires_at': self.expires_at.isoformat(),
+            'acquired_at': self.acquired_at.isoformat() if self.acquired_at else None
+        }
+
+class SnapshotVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)  # Snapshot the counter tracks, e.g. 'positions'
+    version = db.Column(db.Integer, nullable=False, default=0)  # Bumped in the same transaction as any change
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from app import create_app
 from models import Signal, db, TradingSettings
 from config import Config
+from instrument_registry import instrument_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,30 +37,11 @@ def parse_signal(signal_text, source="MANUAL"):
             return None
         
         # Extract symbol
-        symbols = [
-            'EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'USD_CAD',
-            'NZD_USD', 'USD_CHF', 'EUR_GBP', 'EUR_JPY', 'GBP_JPY',
-            'AUD_JPY', 'CAD_JPY', 'CHF_JPY', 'EUR_AUD', 'EUR_CAD',
-            'EUR_CHF', 'EUR_NZD', 'GBP_AUD', 'GBP_CAD', 'GBP_CHF',
-            'GBP_NZD', 'AUD_CAD', 'AUD_CHF', 'AUD_NZD', 'CAD_CHF',
-            'CAD_NZD', 'CHF_NZD', 'NZD_JPY', 'EURUSD', 'GBPUSD',
-            'USDJPY', 'AUDUSD', 'USDCAD', 'NZDUSD', 'USDCHF',
-            'EURGBP', 'EURJPY', 'GBPJPY'
-        ]
-        
-        symbol = None
-        for s in symbols:
-            if s in content:
-                symbol = s
-                break
+        symbol = instrument_registry.find_in_text(content)
         
         if not symbol:
             return None
         
-        # Normalize symbol format
-        if len(symbol) == 6 and '_' not in symbol:
-            symbol = symbol[:3] + '_' + symbol[3:]
-        
         # Extract prices
         price_pattern = r'(\d+\.?\d*)'
         prices = re.findall(price_pattern, content)
@@ -102,7 +84,7 @@ def process_signal(signal_text, source="MANUAL"):
     """Process a signal and add it to the database"""
     try:
         # Create Flask app
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # Parse the signal
@@ -120,6 +102,7 @@ def process_signal(signal_text, source="MANUAL"):
                 take_profit=signal_data['take_profit'],
                 lot_size=signal_data['lot_size'],
                 strategy=f'{source}_SIGNAL',
+                source=source,
                 raw_message=signal_text,
                 processed=False,
                 timestamp=datetime.utcnow()
@@ -211,7 +194,7 @@ def main():
                     
             elif choice == "4":
                 print("\n📊 Recent Signals:")
-                app = create_app()
+                app = create_app(start_executor=False)
                 with app.app_context():
                     signals = Signal.query.order_by(Signal.timestamp.desc()).limit(10).all()
                     if signals:
@@ -223,7 +206,7 @@ def main():
                         
             elif choice == "5":
                 print("\n🎛️ Auto Trading Status:")
-                app = create_app()
+                app = create_app(start_executor=False)
                 with app.app_context():
                     settings = TradingSettings.query.first()
                     auto_trading = settings.auto_trading_enabled if settings else True
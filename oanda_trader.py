@@ -1,53 +1,74 @@
-import oandapyV20
 import oandapyV20.endpoints.orders as orders
 import oandapyV20.endpoints.trades as trades
-import oandapyV20.endpoints.positions as positions
-import oandapyV20.endpoints.accounts as accounts
 import oandapyV20.endpoints.pricing as pricing
-import oandapyV20.endpoints.instruments as instruments
+import oandapyV20.endpoints.transactions as transactions
 import logging
-from datetime import datetime, timedelta
-from models import db, Trade, Position, Account
+import requests
+from datetime import datetime
+from oandapyV20.exceptions import V20Error
+from models import db, Trade, Position, Account, AccountSnapshot, TradingSettings, SnapshotVersion
 from config import Config
+from price_book import PriceBook
+from transaction_stream import TransactionStreamListener
+from account_state import AccountState
+from oanda_transport import get_client, get_stream_client
+from close_engine import EmergencyCloseEngine
+from request_scheduler import request_scheduler, ORDER
+from instrument_registry import instrument_registry
+from candle_store import CandleStore
+from exposure_ledger import ExposureLedger
+from position_sizing import PositionSizer
+from currency_conversion import CurrencyConverter, conversion_instruments
+from persistence_writer import persistence_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class OrderStatusUnknown(Exception):
+    """An order was sent but OANDA could not confirm whether it filled"""
+
 class OANDATrader:
     def __init__(self, app):
         self.app = app
-        self.client = oandapyV20.API(
-            access_token=Config.OANDA_API_KEY,
-            environment=Config.OANDA_ENVIRONMENT
-        )
+        self.client = get_client()
         self.account_id = Config.OANDA_ACCOUNT_ID
         
-        # Price precision for different currency pairs
-        self.price_precision = {
-            'EUR_USD': 5,  # 5 decimal places
-            'GBP_USD': 5,  # 5 decimal places
-            'USD_JPY': 3,  # 3 decimal places
-            'AUD_USD': 5,  # 5 decimal places
-            'USD_CAD': 5,  # 5 decimal places
-            'NZD_USD': 5,  # 5 decimal places
-            'USD_CHF': 5,  # 5 decimal places
-            'EUR_GBP': 5,  # 5 decimal places
-            'EUR_JPY': 3,  # 3 decimal places
-            'GBP_JPY': 3,  # 3 decimal places
-        }
+        # Latest prices fed by the pricing stream
+        self.price_book = PriceBook(get_stream_client(), self.account_id, Config.PRICE_STREAM_INSTRUMENTS)
+        
+        # Account summary, trades and positions refreshed incrementally
+        self.account_state = AccountState(self.client, self.account_id)
+        
+        # Quote -> account currency rates, rebuilt once per price book tick
+        self.converter = CurrencyConverter(self.price_book)
+        
+        # Open trades, units and margin for pre-trade risk checks
+        self.exposure_ledger = ExposureLedger(self.converter)
+        
+        # Risk-based order sizes in the account currency
+        self.position_sizer = PositionSizer(self.converter)
+        
+        # Applies SL/TP fills and other closes made on OANDA's side
+        self.transaction_listener = TransactionStreamListener(
+            app, self.client, self.account_id, get_stream_client(), self.exposure_ledger
+        )
+        
+        # Historical candles cached on disk for analytics and backtests
+        self.candle_store = CandleStore(self.client)
+        
+        # Pip location and display precision for every tradeable instrument
+        instrument_registry.load(self.client, self.account_id)
     
     def format_price(self, price, symbol):
         """Format price according to OANDA precision requirements"""
-        precision = self.price_precision.get(symbol, 5)  # Default to 5 decimal places
+        precision = instrument_registry.display_precision(symbol)  # Defaults to 5 decimal places
         return round(float(price), precision)
     
     def get_account_info(self):
         """Get account information from OANDA"""
         try:
-            r = accounts.AccountDetails(accountID=self.account_id)
-            response = self.client.request(r)
-            
-            account_data = response['account']
+            self.account_state.refresh()
+            account_data = self.account_state.get_summary()
             
             # Update or create account record
             with self.app.app_context():
@@ -58,11 +79,19 @@ class OANDATrader:
                 
                 account.balance = float(account_data['balance'])
                 account.unrealized_pnl = float(account_data.get('unrealizedPL', 0))
-                account.realized_pnl = float(account_data.get('realizedPL', 0))
+                account.realized_pnl = float(account_data.get('pl', 0))
                 account.margin_used = float(account_data.get('marginUsed', 0))
                 account.margin_available = float(account_data.get('marginAvailable', 0))
                 account.currency = account_data.get('currency', 'USD')
                 
+                # Append to the equity series in the same commit
+                db.session.add(AccountSnapshot(
+                    balance=account.balance,
+                    nav=float(account_data.get('NAV', account.balance)),
+                    margin_used=account.margin_used,
+                    unrealized_pnl=account.unrealized_pnl
+                ))
+                
                 db.session.commit()
                 
                 return account.to_dict()
@@ -71,37 +100,96 @@ class OANDATrader:
             logger.error(f"Error getting account info: {e}")
             return None
     
+    def start_price_stream(self):
+        """Start streaming prices into the price book"""
+        if Config.PRICE_STREAM_ENABLED:
+            self.price_book.start()
+    
+    def start_transaction_stream(self):
+        """Start applying account transactions to the Trade table"""
+        if Config.TRANSACTION_STREAM_ENABLED:
+            self.transaction_listener.start()
+    
+    def stop_transaction_stream(self):
+        """Stop applying account transactions (another process has taken over)"""
+        self.transaction_listener.stop()
+    
     def get_current_price(self, symbol):
         """Get current price for a symbol"""
+        return self.get_current_prices([symbol]).get(symbol)
+    
+    def get_current_prices(self, symbols):
+        """Get current prices for several symbols, polling only those missing from the price book"""
+        symbols = sorted(set(symbols))
+        prices = {}
+        
         try:
-            params = {"instruments": symbol}
+            missing = []
+            for symbol in symbols:
+                price_data = self.price_book.get(symbol, Config.PRICE_MAX_AGE_SECONDS)
+                if price_data:
+                    prices[symbol] = price_data
+                else:
+                    missing.append(symbol)
+            
+            if not missing:
+                return prices
+            
+            # Stream the missing instruments from now on
+            self.price_book.subscribe(missing)
+            
+            params = {"instruments": ",".join(missing)}
             r = pricing.PricingInfo(accountID=self.account_id, params=params)
             response = self.client.request(r)
             
-            price_data = response['prices'][0]
-            if price_data['tradeable']:
-                bid = float(price_data['bids'][0]['price'])
-                ask = float(price_data['asks'][0]['price'])
-                return {'bid': bid, 'ask': ask, 'mid': (bid + ask) / 2}
+            for price_data in response['prices']:
+                if price_data['tradeable']:
+                    bid = float(price_data['bids'][0]['price'])
+                    ask = float(price_data['asks'][0]['price'])
+                    self.price_book.update(price_data['instrument'], bid, ask, price_data.get('time'))
+                    prices[price_data['instrument']] = {'bid': bid, 'ask': ask, 'mid': (bid + ask) / 2}
             
-            return None
+            return prices
             
         except Exception as e:
-            logger.error(f"Error getting price for {symbol}: {e}")
-            return None
+            logger.error(f"Error getting prices for {symbols}: {e}")
+            return prices
     
-    def place_order(self, signal):
-        """Place order based on signal"""
+    @staticmethod
+    def client_order_id(signal):
+        """Deterministic OANDA client ID for the order and trade opened by a signal"""
+        return f"sig-{signal.id}"
+    
+    def place_order(self, signal, retry=False):
+        """
+        Place order based on signal.
+        
+        Pass retry=True when the signal may already have been submitted; OANDA is then
+        asked for an order with the signal's client ID before anything is sent.
+        Raises OrderStatusUnknown if the outcome of the order cannot be determined.
+        
+        Returns:
+            Trade for the opened trade, the fill dict if the order filled without opening one
+            (it only reduced or closed opposite trades), or None if nothing was filled
+        """
+        # Price fetch, submission, retries and recovery lookups all outrank maintenance traffic
+        with request_scheduler.priority(ORDER):
+            return self._place_order(signal, retry)
+    
+    def _place_order(self, signal, retry):
         try:
-            symbol = signal.symbol
+            symbol = instrument_registry.resolve(signal.symbol) or signal.symbol
             action = signal.action
-            units = int(signal.lot_size * 100000)  # Convert lot size to units
+            client_id = self.client_order_id(signal)
             
-            if action == 'SELL':
-                units = -units
+            if retry:
+                recovered = self.recover_order(signal)
+                if recovered:
+                    return recovered
             
-            # Get current price
-            price_data = self.get_current_price(symbol)
+            # Get current price, plus any conversion rates sizing needs, in one call
+            symbols = [symbol] + self.position_sizer.required_instruments(symbol, self.exposure_ledger.account_currency)
+            price_data = self.get_current_prices(symbols).get(symbol)
             if not price_data:
                 logger.error(f"Could not get price for {symbol}")
                 return None
@@ -111,9 +199,11 @@ class OANDATrader:
                 "order": {
                     "type": "MARKET",
                     "instrument": symbol,
-                    "units": str(units),
                     "timeInForce": "FOK",
-                    "positionFill": "DEFAULT"
+                    "positionFill": "DEFAULT",
+                    # Lets a retry find this order (and the trade it opened) by signal
+                    "clientExtensions": {"id": client_id, "tag": "signal"},
+                    "tradeClientExtensions": {"id": client_id, "tag": "signal"}
                 }
             }
             
@@ -148,41 +238,192 @@ class OANDATrader:
                 "price": str(tp_price)
             }
             
+            units = self.size_position(symbol, current_price, sl_price, signal.lot_size)
+            if not units:
+                logger.warning(f"Order for {symbol} skipped: position size is zero")
+                return None
+            
+            if action == 'SELL':
+                units = -units
+            order_data["order"]["units"] = str(units)
+            
+            # Enforce max_concurrent_trades and risk_per_trade from memory
+            allowed, reason = self.exposure_ledger.reserve(symbol, units, current_price, sl_price)
+            if not allowed:
+                logger.warning(f"Order for {symbol} blocked by risk limits: {reason}")
+                return None
+            
             # Place order
-            r = orders.OrderCreate(accountID=self.account_id, data=order_data)
-            response = self.client.request(r)
+            try:
+                fill = self._submit_order(order_data, client_id)
+            except Exception:
+                self.exposure_ledger.release()  # The next resync picks the trade up if it did fill
+                raise
             
-            if response['orderFillTransaction']:
-                fill_transaction = response['orderFillTransaction']
-                trade_id = fill_transaction['id']
-                fill_price = float(fill_transaction['price'])
-                
-                # Create trade record
-                with self.app.app_context():
-                    trade = Trade(
-                        oanda_trade_id=trade_id,
-                        signal_id=signal.id,
-                        symbol=symbol,
-                        action=action,
-                        units=units,
-                        entry_price=fill_price,
-                        stop_loss=signal.stop_loss,
-                        take_profit=signal.take_profit,
-                        strategy=signal.strategy
-                    )
-                    
-                    db.session.add(trade)
-                    db.session.commit()
-                    
-                    logger.info(f"Order placed successfully: {action} {symbol} @ {fill_price}")
-                    return trade
+            if not fill or fill['state'] != 'FILLED':
+                self.exposure_ledger.release()
+            elif not fill['trade_id']:
+                # Netted against opposite trades without opening one; the closes reach the ledger via the stream
+                self.exposure_ledger.release()
+                logger.info(f"Order filled without opening a trade: {action} {symbol} @ {fill['price']}")
+                return fill
             else:
+                self.exposure_ledger.open(fill['trade_id'], symbol, fill['units'], fill['price'], reserved=True)
+                trade = self._record_trade(signal, symbol, fill['units'], fill)
+                logger.info(f"Order placed successfully: {action} {symbol} @ {fill['price']}")
+                return trade
+            return None
+            
+        except OrderStatusUnknown:
+            raise
+        except Exception as e:
+            logger.error(f"Error placing order: {e}")
+            return None
+    
+    def recover_order(self, signal):
+        """
+        Settle a signal that may already have been submitted by looking its order up by client ID.
+        Raises OrderStatusUnknown if OANDA cannot be asked.
+        
+        Returns:
+            Trade or fill dict as place_order does if the order filled, or None if it never did
+        """
+        symbol = instrument_registry.resolve(signal.symbol) or signal.symbol
+        with request_scheduler.priority(ORDER):
+            fill = self.find_order_fill(self.client_order_id(signal))
+        if not fill or fill['state'] != 'FILLED':
+            return None
+        
+        logger.info(f"Signal {signal.id} already filled (trade {fill['trade_id'] or 'none opened'}); not resubmitting")
+        if not fill['trade_id']:
+            return fill
+        self.exposure_ledger.open(fill['trade_id'], symbol, fill['units'], fill['price'])
+        return self._record_trade(signal, symbol, fill['units'], fill)
+    
+    def _submit_order(self, order_data, client_id):
+        """Send an order, resubmitting only after OANDA confirms the previous attempt never arrived"""
+        for attempt in range(Config.ORDER_SUBMIT_RETRIES + 1):
+            try:
+                r = orders.OrderCreate(accountID=self.account_id, data=order_data)
+                response = self.client.request(r)
+                
+                fill_transaction = response.get('orderFillTransaction')
+                if fill_transaction:
+                    return self._fill_from_transaction(fill_transaction)
                 logger.error(f"Order failed: {response}")
                 return None
                 
+            except V20Error as e:
+                # A rejection is final, unless it says our client ID is taken by an earlier attempt
+                if e.code < 500 and 'CLIENT_ORDER_ID_ALREADY_EXISTS' not in str(e):
+                    logger.error(f"Order rejected: {e}")
+                    return None
+                error = e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            
+            # Outcome unknown: ask OANDA before sending the order again
+            logger.warning(f"Order {client_id} attempt {attempt + 1} failed ({error}); checking whether it arrived")
+            fill = self.find_order_fill(client_id)
+            if fill:
+                return fill
+        
+        raise OrderStatusUnknown(f"Order {client_id} could not be confirmed after {Config.ORDER_SUBMIT_RETRIES + 1} attempts")
+    
+    def find_order_fill(self, client_id):
+        """
+        Look up an order by client ID.
+        
+        Returns:
+            dict: {'state', 'trade_id', 'price', 'units'} for a filled order (trade_id is None if the
+                  fill only reduced or closed other trades), {'state'} for any other order, or None if
+                  OANDA has no order with that ID
+        """
+        try:
+            r = orders.OrderDetails(accountID=self.account_id, orderID=f"@{client_id}")
+            order = self.client.request(r)['order']
+        except V20Error as e:
+            if e.code == 404:
+                return None
+            raise OrderStatusUnknown(f"Could not look up order {client_id}: {e}")
         except Exception as e:
-            logger.error(f"Error placing order: {e}")
-            return None
+            raise OrderStatusUnknown(f"Could not look up order {client_id}: {e}")
+        
+        if order['state'] != 'FILLED':
+            return {'state': order['state']}
+        
+        # The fill transaction says whether a trade was opened, reduced or closed
+        transaction_id = order.get('fillingTransactionID')
+        try:
+            r = transactions.TransactionDetails(accountID=self.account_id, transactionID=transaction_id)
+            fill_transaction = self.client.request(r)['transaction']
+        except Exception as e:
+            raise OrderStatusUnknown(f"Order {client_id} filled but transaction {transaction_id} could not be read: {e}")
+        
+        return self._fill_from_transaction(fill_transaction)
+    
+    @staticmethod
+    def _fill_from_transaction(fill_transaction):
+        """Fill summary from an ORDER_FILL transaction; units and price are those of the opened trade, if any"""
+        trade_opened = fill_transaction.get('tradeOpened')
+        if not trade_opened:
+            return {'state': 'FILLED', 'trade_id': None, 'price': float(fill_transaction['price']),
+                    'units': int(float(fill_transaction['units']))}
+        
+        return {'state': 'FILLED', 'trade_id': trade_opened['tradeID'],
+                'price': float(trade_opened.get('price', fill_transaction['price'])),
+                'units': int(float(trade_opened['units']))}
+    
+    def size_position(self, symbol, price, stop_loss, lot_size):
+        """Unsigned units for an order: risk-based when possible, otherwise from the signal's lot size"""
+        lot_units = int(lot_size * 100000)  # Convert lot size to units
+        if Config.POSITION_SIZING_MODE != 'risk':
+            return lot_units
+        
+        ledger = self.exposure_ledger
+        risk_percent = ledger.risk_per_trade or Config.MAX_RISK_PERCENT
+        units = self.position_sizer.units_for_risk(symbol, ledger.nav, risk_percent, price, stop_loss,
+                                                   ledger.account_currency)
+        if units is None:
+            logger.warning(f"Cannot size {symbol} by risk yet (equity or conversion rate unknown); using lot size")
+            return lot_units
+        return units
+    
+    def _record_trade(self, signal, symbol, units, fill):
+        """Create the Trade row for a fill, or return it if an earlier attempt already did"""
+        trade = Trade(
+            oanda_trade_id=fill['trade_id'],
+            signal_id=signal.id,
+            symbol=symbol,
+            action=signal.action,
+            units=units,
+            entry_price=fill['price'],
+            stop_loss=signal.stop_loss,
+            take_profit=signal.take_profit,
+            strategy=signal.strategy
+        )
+        
+        # Wait for the group commit: the signal is only marked filled once its trade is durable
+        try:
+            return persistence_writer.submit(self._insert_trade, trade).result(timeout=Config.PERSISTENCE_TIMEOUT)
+        except Exception as e:
+            # The order is live at OANDA; leave the signal SUBMITTED so recovery records it by client ID
+            raise OrderStatusUnknown(f"Trade {fill['trade_id']} filled but could not be recorded: {e!r}") from e
+    
+    @staticmethod
+    def _insert_trade(session, trade):
+        existing = session.query(Trade).filter_by(oanda_trade_id=trade.oanda_trade_id).first()
+        if existing:
+            return existing
+        session.add(trade)
+        return trade
+    
+    @staticmethod
+    def _mark_trade_closed(session, trade_id, close_price, pnl, closed_at):
+        session.query(Trade).filter_by(oanda_trade_id=trade_id).update(
+            {'status': 'CLOSED', 'close_timestamp': closed_at, 'close_price': close_price, 'pnl': pnl},
+            synchronize_session=False
+        )
     
     def close_trade(self, trade_id):
         """Close a specific trade"""
@@ -195,78 +436,52 @@ class OANDATrader:
                 fill_transaction = response['orderFillTransaction']
                 close_price = float(fill_transaction['price'])
                 
-                # Update trade record
-                with self.app.app_context():
-                    trade = Trade.query.filter_by(oanda_trade_id=trade_id).first()
-                    if trade:
-                        trade.status = 'CLOSED'
-                        trade.close_timestamp = datetime.utcnow()
-                        trade.close_price = close_price
-                        trade.pnl = float(fill_transaction['pl'])
-                        
-                        db.session.commit()
-                        
-                        logger.info(f"Trade closed: {trade_id} @ {close_price}")
-                        return True
+                self.exposure_ledger.close(trade_id)
+                
+                # Update trade record in the next group commit
+                persistence_writer.submit(self._mark_trade_closed, trade_id, close_price,
+                                          float(fill_transaction['pl']), datetime.utcnow())
+                
+                logger.info(f"Trade closed: {trade_id} @ {close_price}")
+                return True
                 
         except Exception as e:
             logger.error(f"Error closing trade {trade_id}: {e}")
             return False
     
-    def close_all_trades(self):
-        """Close all open trades"""
+    def sync_exposure(self):
+        """Rebuild the exposure ledger from OANDA and reload the risk limits"""
         try:
-            open_trades = self.get_open_trades()
-            closed_count = 0
-            failed_count = 0
-            
-            for trade in open_trades:
-                try:
-                    data = {"units": "ALL"}
-                    r = trades.TradeClose(accountID=self.account_id, tradeID=trade['id'], data=data)
-                    response = self.client.request(r)
-                    
-                    if response.get('orderFillTransaction'):
-                        fill_transaction = response['orderFillTransaction']
-                        close_price = float(fill_transaction['price'])
-                        
-                        # Update trade record
-                        with self.app.app_context():
-                            db_trade = Trade.query.filter_by(oanda_trade_id=trade['id']).first()
-                            if db_trade:
-                                db_trade.status = 'CLOSED'
-                                db_trade.close_timestamp = datetime.utcnow()
-                                db_trade.close_price = close_price
-                                db_trade.pnl = float(fill_transaction['pl'])
-                        
-                        closed_count += 1
-                        logger.info(f"Trade closed: {trade['id']} @ {close_price}")
-                    else:
-                        failed_count += 1
-                        logger.warning(f"Failed to close trade: {trade['id']}")
-                        
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(f"Error closing trade {trade['id']}: {e}")
+            self.account_state.refresh()
+            self.exposure_ledger.resync(self.account_state.get_trades(), self.account_state.get_summary())
             
             with self.app.app_context():
-                db.session.commit()
+                settings = TradingSettings.query.first()
+                if settings:
+                    self.exposure_ledger.set_limits(settings.max_concurrent_trades, settings.risk_per_trade)
             
-            logger.info(f"Closed {closed_count} trades, {failed_count} failed")
-            return {'closed': closed_count, 'failed': failed_count}
+            return self.exposure_ledger.get_snapshot()
+            
+        except Exception as e:
+            logger.error(f"Error syncing exposure: {e}")
+            return None
+    
+    def close_all_trades(self):
+        """Close all open trades in parallel"""
+        try:
+            return EmergencyCloseEngine(self).close_all()
             
         except Exception as e:
             logger.error(f"Error closing all trades: {e}")
-            return {'closed': 0, 'failed': 0, 'error': str(e)}
+            return {'closed': 0, 'failed': 0, 'results': [], 'error': str(e)}
     
     def get_open_trades(self):
         """Get all open trades from OANDA"""
         try:
-            r = trades.OpenTrades(accountID=self.account_id)
-            response = self.client.request(r)
+            self.account_state.refresh()
             
             open_trades = []
-            for trade_data in response['trades']:
+            for trade_data in self.account_state.get_trades():
                 trade_info = {
                     'id': trade_data['id'],
                     'instrument': trade_data['instrument'],
@@ -286,11 +501,10 @@ class OANDATrader:
     def get_positions(self):
         """Get all positions from OANDA"""
         try:
-            r = positions.OpenPositions(accountID=self.account_id)
-            response = self.client.request(r)
+            self.account_state.refresh()
             
             positions_list = []
-            for position_data in response['positions']:
+            for position_data in self.account_state.get_positions():
                 if float(position_data['long']['units']) != 0 or float(position_data['short']['units']) != 0:
                     position_info = {
                         'instrument': position_data['instrument'],
@@ -307,29 +521,70 @@ class OANDATrader:
             
         except Exception as e:
             logger.error(f"Error getting positions: {e}")
-            return []
+            return None
+    
+    def open_trade_instruments(self):
+        """Instruments priced by update_trade_prices: every open trade's plus its conversion pairs"""
+        try:
+            with self.app.app_context():
+                return self._price_instruments(Trade.query.filter_by(status='OPEN').all())
+        except Exception as e:
+            logger.error(f"Error getting open trade instruments: {e}")
+            return set()
+    
+    def account_currency(self):
+        """Account currency from the account summary, which API-only and executor processes both keep"""
+        currency = self.account_state.get_summary().get('currency')
+        if not currency:
+            try:
+                self.account_state.refresh()
+                currency = self.account_state.get_summary().get('currency')
+            except Exception as e:
+                logger.error(f"Error loading account currency: {e}")
+        return currency or self.exposure_ledger.account_currency
+    
+    def _price_instruments(self, trades):
+        account_currency = self.account_currency()
+        symbols = set()
+        for trade in trades:
+            symbols.add(trade.symbol)
+            symbols.update(conversion_instruments(trade.symbol.partition('_')[2], account_currency))
+        return symbols
     
     def update_trade_prices(self):
         """Update current prices and PnL for all open trades"""
         try:
             with self.app.app_context():
                 open_trades = Trade.query.filter_by(status='OPEN').all()
+                account_currency = self.account_currency()
+                
+                # One pricing request for every instrument with an open trade plus the conversion pairs
+                prices = self.get_current_prices(self._price_instruments(open_trades))
+                matrix = self.converter.matrix(account_currency)
                 
+                unpriced = []
                 for trade in open_trades:
-                    price_data = self.get_current_price(trade.symbol)
-                    if price_data:
+                    price_data = prices.get(trade.symbol)
+                    rate = matrix.rate(trade.symbol.partition('_')[2])
+                    if not price_data or rate is None:
+                        unpriced.append(trade.symbol)
+                    else:
                         trade.current_price = price_data['mid']
                         
-                        # Calculate PnL
+                        # Calculate PnL at the closing side of the spread, as OANDA does, in the account currency
                         if trade.action == 'BUY':
-                            trade.pnl = (price_data['mid'] - trade.entry_price) * abs(trade.units)
+                            quote_pnl = (price_data['bid'] - trade.entry_price) * abs(trade.units)
                         else:
-                            trade.pnl = (trade.entry_price - price_data['mid']) * abs(trade.units)
+                            quote_pnl = (trade.entry_price - price_data['ask']) * abs(trade.units)
                         
-                        trade.pnl_percentage = (trade.pnl / (trade.entry_price * abs(trade.units))) * 100
+                        trade.pnl = quote_pnl * rate
+                        trade.pnl_percentage = (quote_pnl / (trade.entry_price * abs(trade.units))) * 100
                 
                 db.session.commit()
-                logger.info(f"Updated prices for {len(open_trades)} trades")
+                if unpriced:
+                    # Left at their last values rather than converted with a missing or stale rate
+                    logger.warning(f"No fresh price or {account_currency} conversion rate for {sorted(set(unpriced))}; P&L not updated")
+                logger.info(f"Updated prices for {len(open_trades) - len(unpriced)} of {len(open_trades)} trades")
                 
         except Exception as e:
             logger.error(f"Error updating trade prices: {e}")
@@ -341,25 +596,27 @@ class OANDATrader:
                 # Get open trades without stop loss or take profit
                 open_trades = Trade.query.filter_by(status='OPEN').all()
                 
-                for trade in open_trades:
-                    if not trade.stop_loss or not trade.take_profit:
-                        # Get current price
-                        price_data = self.get_current_price(trade.symbol)
-                        if price_data:
-                            current_price = price_data['mid']
-                            
-                            # Calculate stop loss and take profit
-                            if not trade.stop_loss:
-                                if trade.action == 'BUY':
-                                    trade.stop_loss = self.format_price(current_price * 0.995, trade.symbol)
-                                else:
-                                    trade.stop_loss = self.format_price(current_price * 1.005, trade.symbol)
-                            
-                            if not trade.take_profit:
-                                if trade.action == 'BUY':
-                                    trade.take_profit = self.format_price(current_price * 1.01, trade.symbol)
-                                else:
-                                    trade.take_profit = self.format_price(current_price * 0.99, trade.symbol)
+                missing_trades = [trade for trade in open_trades if not trade.stop_loss or not trade.take_profit]
+                prices = self.get_current_prices(trade.symbol for trade in missing_trades)
+                
+                for trade in missing_trades:
+                    # Get current price
+                    price_data = prices.get(trade.symbol)
+                    if price_data:
+                        current_price = price_data['mid']
+                        
+                        # Calculate stop loss and take profit
+                        if not trade.stop_loss:
+                            if trade.action == 'BUY':
+                                trade.stop_loss = self.format_price(current_price * 0.995, trade.symbol)
+                            else:
+                                trade.stop_loss = self.format_price(current_price * 1.005, trade.symbol)
+                        
+                        if not trade.take_profit:
+                            if trade.action == 'BUY':
+                                trade.take_profit = self.format_price(current_price * 1.01, trade.symbol)
+                            else:
+                                trade.take_profit = self.format_price(current_price * 0.99, trade.symbol)
                 
                 db.session.commit()
                 logger.info(f"Updated stop loss and take profit for {len(open_trades)} trades")
@@ -367,31 +624,62 @@ class OANDATrader:
         except Exception as e:
             logger.error(f"Error adding stop loss/take profit to trades: {e}")
     
-    def sync_positions(self):
-        """Sync positions with database"""
+    def sync_positions(self, positions_data=None):
+        """Sync positions with database, writing only the instruments that changed (fetches them unless given)"""
         try:
-            positions_data = self.get_positions()
+            if positions_data is None:
+                positions_data = self.get_positions()
+            if positions_data is None:
+                return  # Keep the stored positions rather than treating a failed fetch as all closed
             
-            with self.app.app_context():
-                # Clear existing positions
-                Position.query.delete()
-                
-                for pos_data in positions_data:
-                    position = Position(
-                        oanda_position_id=f"{pos_data['instrument']}_{datetime.now().timestamp()}",
-                        symbol=pos_data['instrument'],
-                        long_units=pos_data['long_units'],
-                        short_units=pos_data['short_units'],
-                        long_avg_price=pos_data['long_avg_price'],
-                        short_avg_price=pos_data['short_avg_price'],
-                        unrealized_pnl=pos_data['unrealizedPL'],
-                        margin_used=pos_data['marginUsed']
-                    )
-                    
-                    db.session.add(position)
-                
-                db.session.commit()
-                logger.info(f"Synced {len(positions_data)} positions")
+            changes = persistence_writer.submit(self._apply_position_diff, positions_data).result(
+                timeout=Config.PERSISTENCE_TIMEOUT)
+            logger.info(f"Synced {len(positions_data)} positions ({changes} changed)")
                 
         except Exception as e:
             logger.error(f"Error syncing positions: {e}")
+    
+    @staticmethod
+    def _apply_position_diff(session, positions_data):
+        """Upsert changed positions and delete closed ones, keyed by instrument; returns rows touched"""
+        stored = {}
+        changes = 0
+        for position in session.query(Position).all():
+            if position.symbol in stored:  # Duplicates left by the old delete-and-reinsert sync
+                session.delete(position)
+                changes += 1
+            else:
+                stored[position.symbol] = position
+        
+        for pos_data in positions_data:
+            values = {
+                'oanda_position_id': pos_data['instrument'],
+                'long_units': pos_data['long_units'],
+                'short_units': pos_data['short_units'],
+                'long_avg_price': pos_data['long_avg_price'],
+                'short_avg_price': pos_data['short_avg_price'],
+                'unrealized_pnl': pos_data['unrealizedPL'],
+                'margin_used': pos_data['marginUsed']
+            }
+            position = stored.pop(pos_data['instrument'], None)
+            
+            if position is None:
+                session.add(Position(symbol=pos_data['instrument'], **values))
+                changes += 1
+            elif any(getattr(position, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(position, field, value)
+                position.timestamp = datetime.utcnow()
+                changes += 1
+        
+        # Anything left has no open units any more
+        for position in stored.values():
+            session.delete(position)
+            changes += 1
+        
+        if changes:
+            bumped = session.query(SnapshotVersion).filter_by(name='positions').update(
+                {'version': SnapshotVersion.version + 1}, synchronize_session=False)
+            if not bumped:
+                session.add(SnapshotVersion(name='positions', version=1))
+        return changes
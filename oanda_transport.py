@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+OANDA Transport
+This module provides pooled, keep-alive OANDA API clients shared by every trader in the process.
+"""
+
+import random
+import threading
+import time
+import logging
+import requests
+import oandapyV20
+from oandapyV20.exceptions import V20Error
+from requests.adapters import HTTPAdapter
+from config import Config
+from request_scheduler import request_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying for idempotent requests
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+class PooledAPI(oandapyV20.API):
+    """oandapyV20 API client with a sized connection pool, timeouts and jittered GET retries"""
+
+    def __init__(self, access_token, environment, pool_size, timeout, max_retries=0, retry_backoff=0.25, scheduler=None):
+        super().__init__(
+            access_token=access_token,
+            environment=environment,
+            request_params={'timeout': timeout}
+        )
+
+        # One keep-alive pool per host, large enough for the loop, streams and web requests
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.client.mount('https://', adapter)
+        self.client.headers['Connection'] = 'keep-alive'
+
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.scheduler = scheduler
+
+    def request(self, endpoint):
+        """Perform a rate-limited request, retrying idempotent GETs with full-jitter exponential backoff"""
+        if getattr(endpoint, 'STREAM', False):
+            return super().request(endpoint)
+
+        max_retries = self.max_retries if endpoint.method == 'GET' else 0
+        attempt = 0
+        while True:
+            if self.scheduler:
+                self.scheduler.acquire(self.scheduler.classify(endpoint))
+
+            try:
+                return super().request(endpoint)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except V20Error as e:
+                if e.code not in RETRY_STATUS_CODES:
+                    raise
+                error = e
+
+            if attempt >= max_retries:
+                raise error
+
+            delay = random.uniform(0, self.retry_backoff * (2 ** attempt))
+            logger.warning(f"Retrying {endpoint} in {delay:.2f}s after error: {error}")
+            time.sleep(delay)
+            attempt += 1
+
+def get_client():
+    """Get the process-wide REST client"""
+    return _get_shared('rest', lambda: PooledAPI(
+        access_token=Config.OANDA_API_KEY,
+        environment=Config.OANDA_ENVIRONMENT,
+        pool_size=Config.OANDA_POOL_SIZE,
+        timeout=(Config.OANDA_CONNECT_TIMEOUT, Config.OANDA_READ_TIMEOUT),
+        max_retries=Config.OANDA_MAX_RETRIES,
+        retry_backoff=Config.OANDA_RETRY_BACKOFF,
+        scheduler=request_scheduler
+    ))
+
+def get_stream_client():
+    """Get the process-wide streaming client (kept apart so streams never hold REST connections)"""
+    return _get_shared('stream', lambda: PooledAPI(
+        access_token=Config.OANDA_API_KEY,
+        environment=Config.OANDA_ENVIRONMENT,
+        pool_size=2,
+        timeout=(Config.OANDA_CONNECT_TIMEOUT, Config.OANDA_STREAM_READ_TIMEOUT)
+    ))
+
+def _get_shared(kind, factory):
+    key = (kind, Config.OANDA_API_KEY, Config.OANDA_ENVIRONMENT)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = factory()
+        return _clients[key]
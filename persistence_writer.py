@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Persistence Writer
+This module funnels database mutations through one writer thread that applies them in group commits.
+"""
+
+import time
+import queue
+import atexit
+import threading
+import logging
+from concurrent.futures import Future
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import db
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class PersistenceWriter:
+    """Bounded queue of mutations, committed in batches on a short time/size window"""
+
+    def __init__(self, app=None, max_queue=None, batch_size=None, window=None):
+        self.app = None
+        self.batch_size = batch_size or Config.PERSISTENCE_BATCH_SIZE
+        self.window = window if window is not None else Config.PERSISTENCE_BATCH_WINDOW
+        self._queue = queue.Queue(maxsize=max_queue or Config.PERSISTENCE_QUEUE_SIZE)
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._mutations = 0
+        self._failures = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self.stop)
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='persistence-writer', daemon=True)
+            self._thread.start()
+            logger.info("Persistence writer started")
+
+    def stop(self, timeout=10):
+        """Commit whatever is queued, then stop the writer thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, func, *args):
+        """
+        Queue a mutation for the next group commit.
+
+        Args:
+            func (callable): Called as func(session, *args) on the writer thread; must not commit
+            *args: Arguments for func
+
+        Returns:
+            Future: Resolves to func's return value once the commit is durable
+        """
+        future = Future()
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+
+        try:
+            self._queue.put((func, args, future), timeout=Config.PERSISTENCE_TIMEOUT)
+        except queue.Full:
+            logger.error(f"Persistence queue full ({self._queue.maxsize}), dropping {getattr(func, '__name__', func)}")
+            future.set_exception(RuntimeError("Persistence queue full"))
+        return future
+
+    def add(self, obj):
+        """Queue a new row; the future resolves to the object with its primary key loaded"""
+        return self.submit(_add, obj)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'running': bool(self._thread and self._thread.is_alive()),
+                'queued': self._queue.qsize(),
+                'batches': self._batches,
+                'mutations': self._mutations,
+                'failures': self._failures,
+                'avg_batch_size': round(self._mutations / self._batches, 2) if self._batches else 0
+            }
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                with self.app.app_context():
+                    self._commit(batch)
+            elif self._stop.is_set():
+                return
+
+    def _next_batch(self):
+        """Block for the first mutation, then gather more until the window closes or the batch is full"""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, batch):
+        """Apply a batch in one transaction; if anything fails, replay it one mutation per commit"""
+        try:
+            results = self._apply(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0], e)
+                return
+            logger.warning(f"Group commit of {len(batch)} mutations failed ({e}), retrying individually")
+            for item in batch:
+                try:
+                    self._finish([item], self._apply([item]))
+                except Exception as item_error:
+                    self._fail(item, item_error)
+            return
+
+        self._finish(batch, results)
+
+    def _apply(self, batch):
+        # Objects stay loaded after commit so callers can read them from their own threads
+        with Session(db.engine, expire_on_commit=False) as session:
+            event.listen(session, 'persistent_to_transient', _clear_primary_key)
+            try:
+                results = [func(session, *args) for func, args, _ in batch]
+                session.commit()
+                return results
+            except Exception:
+                session.rollback()  # Rows inserted by this batch go back to transient, without their keys
+                raise
+
+    def _finish(self, batch, results):
+        with self._lock:
+            self._batches += 1
+            self._mutations += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _fail(self, item, error):
+        func, _, future = item
+        logger.error(f"Error persisting {getattr(func, '__name__', func)}: {error}")
+        with self._lock:
+            self._failures += 1
+        future.set_exception(error)
+
+def _clear_primary_key(session, obj):
+    # A rolled-back INSERT keeps its assigned ID; replaying it with that ID could collide with a newer row
+    mapper = inspect(obj).mapper
+    for column in mapper.primary_key:
+        setattr(obj, mapper.get_property_by_column(column).key, None)
+
+def _add(session, obj):
+    session.add(obj)
+    session.flush()
+    return obj
+
+# Global persistence writer instance
+persistence_writer = PersistenceWriter()
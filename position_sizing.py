@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Position Sizing
+This module sizes orders from account equity, risk percent and stop distance in the account currency.
+"""
+
+import math
+import logging
+from instrument_registry import instrument_registry
+from currency_conversion import conversion_instruments
+
+logger = logging.getLogger(__name__)
+
+class PositionSizer:
+    """Risk-based units with pip values taken from the per-tick conversion matrix"""
+
+    def __init__(self, converter):
+        self.converter = converter  # CurrencyConverter; never hits the network
+
+    def required_instruments(self, instrument, account_currency):
+        """Instruments whose prices are needed to value this instrument's pips in the account currency"""
+        return conversion_instruments(instrument.partition('_')[2], account_currency)
+
+    def pip_value(self, instrument, account_currency):
+        """
+        Value of one pip on one unit, in the account currency.
+
+        Returns:
+            float: Pip value, or None if a conversion rate is not in the price book yet
+        """
+        rate = self.converter.rate(instrument.partition('_')[2], account_currency)
+        return instrument_registry.pip_size(instrument) * rate if rate is not None else None
+
+    def units_for_risk(self, instrument, equity, risk_percent, entry_price, stop_loss, account_currency):
+        """
+        Units that lose risk_percent of equity if the stop loss is hit.
+
+        Returns:
+            int: Unsigned units (0 if below the minimum trade size), or None if the size cannot be computed
+        """
+        if not equity or not risk_percent or not stop_loss or entry_price == stop_loss:
+            return None
+
+        pip_value = self.pip_value(instrument, account_currency)
+        if not pip_value:
+            return None
+
+        stop_pips = abs(entry_price - stop_loss) / instrument_registry.pip_size(instrument)
+        risk_amount = equity * risk_percent / 100
+        units = math.floor(risk_amount / (stop_pips * pip_value) + 1e-9)  # Guard against 19999.999...
+
+        if units < instrument_registry.min_trade_size(instrument):
+            logger.warning(f"Risk of {risk_amount:.2f} {account_currency} over {stop_pips:.1f} pips "
+                           f"is below the minimum trade size for {instrument}")
+            return 0
+        return units
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Price Book
+This module keeps the latest OANDA prices in memory, fed by the v20 pricing stream.
+"""
+
+import threading
+import time
+import logging
+import oandapyV20.endpoints.pricing as pricing
+from oandapyV20.exceptions import StreamTerminated, V20Error
+from instrument_registry import instrument_registry
+
+logger = logging.getLogger(__name__)
+
+class PriceBook:
+    """Latest bid/ask/mid per instrument, kept current by a background PricingStream"""
+
+    def __init__(self, client, account_id, instruments=None):
+        self.client = client
+        self.account_id = account_id
+        self._instruments = set(self._valid(instruments or []))
+        self._last_added = set()
+        self._prices = {}
+        self.version = 0  # Bumped on every update so derived data knows when to rebuild
+        self._lock = threading.Lock()
+        self._resubscribe = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the streaming thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='price-book', daemon=True)
+        self._thread.start()
+        logger.info(f"Price stream started for {sorted(self._instruments)}")
+
+    def stop(self):
+        """Stop the streaming thread after its next message"""
+        self._stop.set()
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def subscribe(self, symbols):
+        """Add known instruments to the stream; reconnects if the set changed"""
+        with self._lock:
+            new_symbols = set(self._valid(symbols)) - self._instruments
+            if not new_symbols:
+                return
+            self._instruments.update(new_symbols)
+            self._last_added = new_symbols
+
+        logger.info(f"Subscribing price stream to {sorted(new_symbols)}")
+        self._resubscribe.set()
+
+    def update(self, instrument, bid, ask, price_time=None):
+        """Store a price for an instrument"""
+        with self._lock:
+            self._prices[instrument] = {
+                'bid': bid,
+                'ask': ask,
+                'mid': (bid + ask) / 2,
+                'time': price_time,
+                'received': time.monotonic()
+            }
+            self.version += 1
+
+    def get(self, symbol, max_age=None):
+        """
+        Get the latest price for a symbol.
+
+        Args:
+            symbol (str): OANDA instrument name
+            max_age (float, optional): Staleness budget in seconds
+
+        Returns:
+            dict: bid/ask/mid price, or None if missing or older than max_age
+        """
+        with self._lock:
+            price = self._prices.get(symbol)
+
+        if not price:
+            return None
+
+        if max_age is not None and time.monotonic() - price['received'] > max_age:
+            return None
+
+        return {'bid': price['bid'], 'ask': price['ask'], 'mid': price['mid'], 'time': price['time']}
+
+    def snapshot(self, max_age=None):
+        """Get a copy of all prices currently in the book, leaving out those older than max_age seconds"""
+        now = time.monotonic()
+        with self._lock:
+            return {symbol: dict(price) for symbol, price in self._prices.items()
+                    if max_age is None or now - price['received'] <= max_age}
+
+    def _run(self):
+        """Consume the pricing stream, reconnecting with backoff on errors"""
+        backoff = 1
+
+        while not self._stop.is_set():
+            with self._lock:
+                instruments = sorted(self._instruments)
+
+            if not instruments:
+                self._resubscribe.wait(1)
+                continue
+
+            self._resubscribe.clear()
+
+            try:
+                params = {"instruments": ",".join(instruments)}
+                r = pricing.PricingStream(accountID=self.account_id, params=params)
+
+                for msg in self.client.request(r):
+                    if msg.get('type') == 'PRICE' and msg.get('tradeable') is False:
+                        # Market closed or halted: a stored quote would look executable
+                        self._discard(msg['instrument'])
+                    elif msg.get('type') == 'PRICE' and msg.get('bids') and msg.get('asks'):
+                        self.update(
+                            msg['instrument'],
+                            float(msg['bids'][0]['price']),
+                            float(msg['asks'][0]['price']),
+                            msg.get('time')
+                        )
+
+                    backoff = 1
+
+                    if self._stop.is_set() or self._resubscribe.is_set():
+                        r.terminate("resubscribe")
+
+            except StreamTerminated:
+                continue
+            except V20Error as e:
+                if e.code == 400 and self._drop_rejected(instruments):
+                    continue
+                logger.error(f"Price stream error, reconnecting in {backoff}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+            except Exception as e:
+                logger.error(f"Price stream error, reconnecting in {backoff}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _discard(self, instrument):
+        with self._lock:
+            if self._prices.pop(instrument, None):
+                self.version += 1
+
+    def _drop_rejected(self, instruments):
+        """
+        Remove the instruments a 400 from PricingStream most likely refers to.
+
+        Returns:
+            bool: True if anything was dropped (so reconnecting can succeed)
+        """
+        with self._lock:
+            rejected = {symbol for symbol in instruments if not instrument_registry.get(symbol)} or self._last_added
+            rejected &= self._instruments
+            self._instruments -= rejected
+            self._last_added = set()
+
+        if rejected:
+            logger.error(f"Price stream rejected the instrument list; dropped {sorted(rejected)}")
+        return bool(rejected)
+
+    @staticmethod
+    def _valid(symbols):
+        """Symbols the registry knows as OANDA instrument names (all of them if it has not loaded)"""
+        if not instrument_registry.names():
+            return list(symbols)
+
+        valid = []
+        for symbol in symbols:
+            if instrument_registry.resolve(symbol) == symbol:
+                valid.append(symbol)
+            else:
+                logger.warning(f"Not streaming unknown instrument {symbol}")
+        return valid
@@ -76,7 +76,7 @@ def test_database_structure():
         from app import create_app
         from models import db, UserToken
         
-        app = create_app()
+        app = create_app(start_executor=False)
         with app.app_context():
             # Check if UserToken table exists and has all columns
             inspector = db.inspect(db.engine)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Request Scheduler
+This module rate-limits OANDA REST calls process-wide with a token bucket and serves waiting callers by priority.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, most urgent first
+CLOSE = 0
+ORDER = 1
+MODIFY = 2
+PRICING = 3
+SYNC = 4
+
+PRIORITY_NAMES = {
+    CLOSE: 'close',
+    ORDER: 'order',
+    MODIFY: 'modify',
+    PRICING: 'pricing',
+    SYNC: 'sync'
+}
+
+# Endpoint class name -> priority; anything else is account/position sync
+ENDPOINT_PRIORITIES = {
+    'TradeClose': CLOSE,
+    'PositionClose': CLOSE,
+    'OrderCreate': ORDER,
+    'TradeCRCDO': MODIFY,
+    'TradeClientExtensions': MODIFY,
+    'OrderReplace': MODIFY,
+    'OrderCancel': MODIFY,
+    'PricingInfo': PRICING,
+    'InstrumentsCandles': PRICING
+}
+
+class RequestScheduler:
+    """Token bucket shared by all threads; when tokens run out the most urgent waiter goes first"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._local = threading.local()
+        self._stats = {
+            priority: {'queue_depth': 0, 'requests': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+            for priority in PRIORITY_NAMES
+        }
+
+    def classify(self, endpoint):
+        """Get the priority for an endpoint, honouring any priority() override on this thread"""
+        override = getattr(self._local, 'priority', None)
+        if override is not None:
+            return override
+        return ENDPOINT_PRIORITIES.get(type(endpoint).__name__, SYNC)
+
+    @contextmanager
+    def priority(self, priority):
+        """Run the enclosed OANDA calls on this thread at the given priority"""
+        previous = getattr(self._local, 'priority', None)
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def acquire(self, priority):
+        """Block until a token is available and no more urgent request is waiting"""
+        start = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        acquired = False
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            self._stats[priority]['queue_depth'] += 1
+
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] == ticket and self._tokens >= 1:
+                        heapq.heappop(self._waiting)
+                        self._tokens -= 1
+                        acquired = True
+                        break
+
+                    # The head waits for its token; everyone else waits to become head
+                    timeout = (1 - self._tokens) / self.rate if self._waiting[0] == ticket else None
+                    self._cond.wait(timeout)
+            finally:
+                if not acquired:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+
+                stats = self._stats[priority]
+                stats['queue_depth'] -= 1
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            stats['requests'] += 1
+            stats['wait_total'] += waited
+            stats['wait_max'] = max(stats['wait_max'], waited)
+
+        if waited > 1:
+            logger.warning(f"OANDA {PRIORITY_NAMES[priority]} request waited {waited:.2f}s for rate limit")
+
+    def get_metrics(self):
+        """Queue depth and wait time per priority class"""
+        with self._cond:
+            self._refill()
+            metrics = {'tokens_available': round(self._tokens, 2), 'rate': self.rate, 'burst': self.capacity}
+            for priority, stats in self._stats.items():
+                requests = stats['requests']
+                metrics[PRIORITY_NAMES[priority]] = {
+                    'queue_depth': stats['queue_depth'],
+                    'requests': requests,
+                    'avg_wait_ms': round(stats['wait_total'] / requests * 1000, 2) if requests else 0.0,
+                    'max_wait_ms': round(stats['wait_max'] * 1000, 2)
+                }
+            return metrics
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+# Global instance shared by every OANDA client in the process
+request_scheduler = RequestScheduler(Config.OANDA_RATE_LIMIT, Config.OANDA_RATE_BURST)
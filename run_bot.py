@@ -69,9 +69,12 @@ def main():
     if not check_environment():
         sys.exit(1)
     
+    # --no-executor serves the dashboard only; trading runs in another process
+    start_executor = Config.EXECUTOR_ENABLED and '--no-executor' not in sys.argv[1:]
+    
     try:
         # Create Flask app
-        app = create_app()
+        app = create_app(start_executor=start_executor)
         
         print("✅ Environment variables loaded")
         print("✅ Database initialized")
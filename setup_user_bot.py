@@ -87,7 +87,7 @@ def main():
     print()
     
     # Create Flask app context
-    app = create_app()
+    app = create_app(start_executor=False)
     
     with app.app_context():
         # Get user token
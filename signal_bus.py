@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Signal Bus
+This module hands newly stored signals to the execution worker in-process, without waiting for the next DB poll.
+"""
+
+import queue
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class SignalBus:
+    """Queue of signal IDs awaiting execution, with signal-to-order latency tracking"""
+
+    def __init__(self, latency_window=1000):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._published = 0
+        self._executed = 0
+        self.subscribed = False  # Set once this process runs an execution worker
+
+    def subscribe(self):
+        """Declare that an execution worker in this process consumes the bus"""
+        self.subscribed = True
+
+    def publish(self, signal_id):
+        """
+        Queue a signal for execution.
+
+        Args:
+            signal_id (int): Signal primary key (the row must already be committed)
+
+        Returns:
+            bool: False if the signal is already queued or executing, or nothing in this
+                  process executes signals (another executor's sweep picks it up)
+        """
+        if not self.subscribed:
+            return False
+
+        with self._lock:
+            if signal_id in self._pending:
+                return False
+            self._pending.add(signal_id)
+            self._published += 1
+
+        self._queue.put(signal_id)
+        return True
+
+    def get(self, timeout=None):
+        """Get the next signal ID, or None after timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def done(self, signal_id, signal_timestamp=None):
+        """Mark a signal as handled; pass its creation time when an order was placed"""
+        with self._lock:
+            self._pending.discard(signal_id)
+            if signal_timestamp:
+                self._executed += 1
+                self._latencies.append((datetime.utcnow() - signal_timestamp).total_seconds())
+
+    def get_metrics(self):
+        """Queue depth and signal-to-order latency percentiles in milliseconds"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = {
+                'queue_depth': self._queue.qsize(),
+                'pending': len(self._pending),
+                'subscribed': self.subscribed,
+                'published': self._published,
+                'executed': self._executed
+            }
+
+        for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            index = min(len(latencies) - 1, int(fraction * len(latencies)))
+            metrics[f'latency_{name}_ms'] = round(latencies[index] * 1000, 1) if latencies else None
+        metrics['latency_max_ms'] = round(latencies[-1] * 1000, 1) if latencies else None
+
+        return metrics
+
+# Global instance shared by producers and the execution worker
+signal_bus = SignalBus()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Signal Claims
+This module lets executor processes claim signals atomically so each signal is executed exactly once.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import update, select, and_, or_, case
+from models import db, Signal
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Signal lifecycle: NEW -> CLAIMED -> SUBMITTED -> FILLED | FAILED, or NEW/CLAIMED -> EXPIRED.
+# An expired SUBMITTED claim is taken over as SUBMITTED so the new owner checks
+# OANDA for the order (by client ID) before it is ever sent again; if there is
+# none and the signal is stale by then, it goes SUBMITTED -> EXPIRED.
+NEW = 'NEW'
+CLAIMED = 'CLAIMED'
+SUBMITTED = 'SUBMITTED'
+FILLED = 'FILLED'
+FAILED = 'FAILED'
+EXPIRED = 'EXPIRED'
+
+TERMINAL_STATUSES = (FILLED, FAILED, EXPIRED)
+
+class SignalClaimer:
+    """Claims, advances and releases signals on behalf of one executor"""
+
+    def __init__(self, owner, lease_seconds=None):
+        self.owner = owner
+        self.lease_seconds = lease_seconds or Config.SIGNAL_CLAIM_TTL
+
+    def claim_batch(self, limit=None, conditions=()):
+        """
+        Claim up to limit claimable signals, oldest first.
+
+        Must be called inside an app context.
+
+        Args:
+            limit (int): Maximum signals to claim
+            conditions (tuple): Extra filters on Signal (e.g. the signal source)
+
+        Returns:
+            list: IDs of the signals now claimed by this executor
+        """
+        limit = limit or Config.SIGNAL_CLAIM_BATCH
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        candidates = (
+            select(Signal.id)
+            .where(self._claimable(now), *conditions)
+            .order_by(Signal.id)
+            .limit(limit)
+        )
+
+        if db.engine.dialect.name == 'postgresql':
+            # Concurrent executors skip each other's locked rows instead of queueing behind them
+            candidates = candidates.with_for_update(skip_locked=True)
+            result = db.session.execute(
+                update(Signal)
+                .where(Signal.id.in_(candidates.scalar_subquery()))
+                .values(status=self._claimed_status(), claim_owner=self.owner, claim_expires_at=expires_at)
+                .returning(Signal.id)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = sorted(result.scalars())
+        else:
+            # The claimable predicate is re-checked by the UPDATE, so a row another
+            # executor took in between is left alone
+            ids = list(db.session.execute(candidates).scalars())
+            claimed = []
+            if ids:
+                db.session.execute(
+                    update(Signal)
+                    .where(Signal.id.in_(ids), self._claimable(now))
+                    .values(status=self._claimed_status(), claim_owner=self.owner, claim_expires_at=expires_at)
+                    .execution_options(synchronize_session=False)
+                )
+                claimed = list(db.session.execute(
+                    select(Signal.id)
+                    .where(Signal.id.in_(ids), Signal.claim_owner == self.owner,
+                           Signal.claim_expires_at == expires_at)
+                    .order_by(Signal.id)
+                ).scalars())
+
+        db.session.commit()
+        if claimed:
+            logger.info(f"Claimed {len(claimed)} signals for {self.owner}")
+        return claimed
+
+    def claim(self, signal_id):
+        """Claim a single signal; also succeeds if this executor already holds an unexpired claim (CLAIMED or SUBMITTED)"""
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(Signal)
+            .where(Signal.id == signal_id)
+            .where(or_(
+                self._claimable(now),
+                and_(Signal.status.in_((CLAIMED, SUBMITTED)), Signal.claim_owner == self.owner,
+                     Signal.claim_expires_at >= now)
+            ))
+            .values(status=self._claimed_status(), claim_owner=self.owner,
+                    claim_expires_at=now + timedelta(seconds=self.lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def transition(self, signal_id, from_status, to_status):
+        """
+        Move a signal we own from one status to the next.
+
+        Returns:
+            bool: False if the claim was lost (expired and taken by another executor)
+        """
+        values = {'status': to_status}
+        if to_status == SUBMITTED:
+            # The order round trip gets a full lease before anyone else may recover it
+            values['claim_expires_at'] = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+        if to_status in TERMINAL_STATUSES:
+            values['processed'] = True
+            values['claim_expires_at'] = None
+
+        result = db.session.execute(
+            update(Signal)
+            .where(Signal.id == signal_id, Signal.status == from_status, Signal.claim_owner == self.owner)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if result.rowcount != 1:
+            logger.warning(f"Signal {signal_id} is no longer claimed by {self.owner}; not moving it to {to_status}")
+            return False
+        return True
+
+    def expire_stale(self, cutoffs, default_cutoff, conditions=()):
+        """
+        Move unsubmitted signals older than their source's cutoff to EXPIRED in one UPDATE.
+
+        Args:
+            cutoffs (dict): Signal source -> creation time cutoff
+            default_cutoff (datetime): Cutoff for any other source
+            conditions (tuple): Extra filters on Signal
+
+        Returns:
+            int: Number of signals expired
+        """
+        now = datetime.utcnow()
+        too_old = [and_(Signal.source == source, Signal.timestamp < cutoff) for source, cutoff in cutoffs.items()]
+        too_old.append(and_(
+            or_(Signal.source.is_(None), Signal.source.notin_(list(cutoffs))),
+            Signal.timestamp < default_cutoff
+        ))
+
+        result = db.session.execute(
+            update(Signal)
+            .where(self._claimable(now), Signal.status != SUBMITTED, or_(*too_old), *conditions)
+            .values(status=EXPIRED, processed=True, claim_owner=None, claim_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if result.rowcount:
+            logger.info(f"Expired {result.rowcount} stale signals")
+        return result.rowcount
+
+    def expire(self, signal_ids):
+        """Move signals we hold (CLAIMED, not yet submitted) to EXPIRED in one UPDATE"""
+        if not signal_ids:
+            return 0
+        result = db.session.execute(
+            update(Signal)
+            .where(Signal.id.in_(list(signal_ids)), Signal.status == CLAIMED, Signal.claim_owner == self.owner)
+            .values(status=EXPIRED, processed=True, claim_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    def release(self, signal_id):
+        """Hand a claimed but unsubmitted signal back to NEW"""
+        return self._reset(Signal.id == signal_id, Signal.claim_owner == self.owner)
+
+    def release_all(self):
+        """Hand back every unsubmitted claim this executor holds (e.g. on shutdown)"""
+        return self._reset(Signal.claim_owner == self.owner)
+
+    def _reset(self, *conditions):
+        result = db.session.execute(
+            update(Signal)
+            .where(Signal.status == CLAIMED, *conditions)
+            .values(status=NEW, claim_owner=None, claim_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def _claimable(now):
+        return or_(
+            Signal.status == NEW,
+            and_(Signal.status.in_((CLAIMED, SUBMITTED)), Signal.claim_expires_at < now)
+        )
+
+    @staticmethod
+    def _claimed_status():
+        # A submitted signal stays SUBMITTED: the order may already be live at the broker
+        return case((Signal.status == SUBMITTED, SUBMITTED), else_=CLAIMED)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Signal Freshness
+This module decides when a signal is too old, or the market too far from its entry, to be worth executing.
+"""
+
+from datetime import datetime, timedelta
+from instrument_registry import instrument_registry
+from config import Config
+
+def ttl_for(source):
+    """Seconds a signal from this source stays executable"""
+    return Config.SIGNAL_TTL_SECONDS.get(source, Config.SIGNAL_TTL_DEFAULT)
+
+def expiry_cutoffs(now=None):
+    """
+    Timestamp cutoffs per source: signals created before their cutoff have expired.
+
+    Returns:
+        tuple: ({source: cutoff}, cutoff for any other source)
+    """
+    now = now or datetime.utcnow()
+    cutoffs = {source: now - timedelta(seconds=ttl) for source, ttl in Config.SIGNAL_TTL_SECONDS.items()}
+    return cutoffs, now - timedelta(seconds=Config.SIGNAL_TTL_DEFAULT)
+
+def is_expired(signal, now=None):
+    now = now or datetime.utcnow()
+    return signal.timestamp is not None and (now - signal.timestamp).total_seconds() > ttl_for(signal.source)
+
+def drift_pips(signal, price_data):
+    """Pips between the signal's entry price and the live mid, or None if either is unknown"""
+    if not signal.entry_price or not price_data:
+        return None
+    return abs(price_data['mid'] - signal.entry_price) / instrument_registry.pip_size(signal.symbol)
+
+def is_drifted(signal, price_data):
+    drift = drift_pips(signal, price_data)
+    return drift is not None and drift > Config.MAX_SLIPPAGE_PIPS
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Storage Engine Profile
+This module tunes the SQLAlchemy engine for the database in use: WAL and pragmas for SQLite, a connection pool for Postgres.
+"""
+
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def engine_options(database_uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a database URI.
+
+    Returns:
+        dict: Engine keyword arguments
+    """
+    url = make_url(database_uri)
+
+    if url.get_backend_name() == 'sqlite':
+        # pysqlite's own lock wait, in seconds; busy_timeout below covers connections it did not open
+        return {'connect_args': {'timeout': Config.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+
+    return {
+        'pool_size': Config.DB_POOL_SIZE,
+        'max_overflow': Config.DB_MAX_OVERFLOW,
+        'pool_timeout': Config.DB_POOL_TIMEOUT,
+        'pool_recycle': Config.DB_POOL_RECYCLE,
+        'pool_pre_ping': True  # Drop connections the server closed while they sat in the pool
+    }
+
+def sqlite_pragmas():
+    """Pragmas applied to every new SQLite connection, in order"""
+    return [
+        ('journal_mode', 'WAL'),  # Readers never block the writer (and vice versa)
+        ('synchronous', 'NORMAL'),  # Safe with WAL; fsync at checkpoints instead of every commit
+        ('busy_timeout', Config.SQLITE_BUSY_TIMEOUT_MS),
+        ('cache_size', -Config.SQLITE_CACHE_SIZE_KB),  # Negative means KiB rather than pages
+        ('mmap_size', Config.SQLITE_MMAP_SIZE)
+    ]
+
+def init_storage(app, db):
+    """
+    Set engine options before db.init_app and install the SQLite pragmas once the engine exists.
+
+    Sessions need no extra setup: Flask-SQLAlchemy scopes db.session to the app context, and every
+    thread (request handlers, scheduler jobs, executor workers, the Discord loop) pushes its own.
+    """
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+    db.init_app(app)
+
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            logger.info(f"Using pooled {engine.dialect.name} engine (pool size {Config.DB_POOL_SIZE})")
+            return
+
+        event.listen(engine, 'connect', _apply_sqlite_pragmas)
+        with engine.connect() as connection:
+            mode = connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+        logger.info(f"SQLite journal mode: {mode}")
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
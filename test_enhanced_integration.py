@@ -107,7 +107,7 @@ def test_database_structure():
         from app import create_app
         from models import db, TradingViewConfig, OANDAConfig
         
-        app = create_app()
+        app = create_app(start_executor=False)
         with app.app_context():
             # Check if TradingViewConfig table exists and has all columns
             inspector = db.inspect(db.engine)
@@ -185,7 +185,7 @@ def test_configuration_managers():
         from config_manager import TradingViewConfigManager, OANDAConfigManager
         from app import create_app
         
-        app = create_app()
+        app = create_app(start_executor=False)
         with app.app_context():
             # Test TradingViewConfigManager
             print("🔍 Testing TradingViewConfigManager...")
@@ -268,7 +268,7 @@ def test_tradingview_signal_fetcher():
         from tradingview_signal_fetcher import TradingViewSignalFetcher
         from app import create_app
         
-        app = create_app()
+        app = create_app(start_executor=False)
         with app.app_context():
             fetcher = TradingViewSignalFetcher(app)
             
@@ -23,7 +23,7 @@ def test_enhanced_token_management():
     print("🔐 Testing Enhanced Token Management...")
     
     try:
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # Test data
@@ -125,7 +125,7 @@ def test_device_fingerprint_generation():
         test_fingerprint = "test_device_fingerprint_12345"
         
         # Test saving token with fingerprint
-        app = create_app()
+        app = create_app(start_executor=False)
         with app.app_context():
             test_user_id = "999888777666555444"
             test_token = "999888777666555444.zyxwvutsrqponmlkjihgfedcba"
@@ -159,7 +159,7 @@ def test_multiple_devices():
     print("\n🖥️ Testing Multiple Devices...")
     
     try:
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # Device 1
@@ -45,7 +45,7 @@ def test_user_token_manager():
     print("\n👤 Testing User Token Manager...")
     
     try:
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # Test data
@@ -111,7 +111,7 @@ def test_database_models():
     print("\n🗄️ Testing Database Models...")
     
     try:
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             from models import UserToken, db
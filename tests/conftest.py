@@ -0,0 +1,38 @@
+"""
+Test fixtures
+A throwaway SQLite database per test, with the persistence writer bound to it.
+"""
+
+import os
+import sys
+
+# Config reads the environment at import time: keep tests off the network and the real database
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ['PRICE_STREAM_ENABLED'] = 'false'
+os.environ['TRANSACTION_STREAM_ENABLED'] = 'false'
+os.environ['OANDA_MAX_RETRIES'] = '0'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask
+from models import db
+from storage import init_storage
+from persistence_writer import persistence_writer
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    init_storage(app, db)
+    persistence_writer.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+
+    yield app
+
+    persistence_writer.stop()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
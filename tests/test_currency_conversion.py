@@ -0,0 +1,41 @@
+"""
+Conversion matrix built from the price book, including prices that have gone stale.
+"""
+
+import time
+from price_book import PriceBook
+from currency_conversion import ConversionMatrix, CurrencyConverter
+
+def mid(value):
+    return {'bid': value, 'ask': value, 'mid': value}
+
+def test_direct_inverse_and_usd_cross_rates():
+    matrix = ConversionMatrix('GBP', {'GBP_USD': mid(1.25), 'EUR_GBP': mid(0.85), 'USD_JPY': mid(150.0)})
+
+    assert matrix.rate('GBP') == 1.0
+    assert matrix.rate('EUR') == 0.85
+    assert matrix.rate('USD') == 1 / 1.25
+    assert abs(matrix.rate('JPY') - (1 / 150.0) / 1.25) < 1e-12
+    assert matrix.rate('CHF') is None
+
+def test_stale_price_drops_out_without_a_new_tick():
+    book = PriceBook(None, 'acct')
+    converter = CurrencyConverter(book, max_age=0.2)
+    book.update('EUR_USD', 1.1, 1.1)
+    assert converter.rate('EUR', 'USD') == 1.1
+
+    time.sleep(0.3)
+    assert converter.rate('EUR', 'USD') is None  # No tick since, but the matrix is rebuilt without the stale price
+
+    book.update('EUR_USD', 1.2, 1.2)
+    assert converter.rate('EUR', 'USD') == 1.2
+
+def test_matrix_is_reused_until_the_book_changes():
+    book = PriceBook(None, 'acct')
+    converter = CurrencyConverter(book, max_age=60)
+    book.update('EUR_USD', 1.1, 1.1)
+
+    assert converter.matrix('USD') is converter.matrix('USD')
+    first = converter.matrix('USD')
+    book.update('GBP_USD', 1.25, 1.25)
+    assert converter.matrix('USD') is not first
@@ -0,0 +1,49 @@
+"""
+Equity history queries: range validation, UTC parsing, rollups and downsampling.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from models import db, AccountSnapshot
+from equity_history import EquityHistory, parse_utc, lttb
+
+def test_parse_utc_returns_naive_utc():
+    expected = datetime(2026, 10, 17, 12, 0)
+    assert parse_utc('2026-10-17T12:00:00Z') == expected
+    assert parse_utc('2026-10-17T14:00:00+02:00') == expected
+    assert parse_utc('2026-10-17T12:00:00') == expected
+    with pytest.raises(ValueError):
+        parse_utc('yesterday')
+
+def test_range_must_run_forwards(app):
+    end = datetime.utcnow()
+    with pytest.raises(ValueError, match='start must be before end'):
+        EquityHistory(app).query(end, end)
+    with pytest.raises(ValueError):
+        EquityHistory(app).query(end, end - timedelta(hours=1))
+
+@pytest.mark.parametrize('points', [0, 1, 2, -5])
+def test_fewer_than_three_points_is_rejected(app, points):
+    end = datetime.utcnow()
+    with pytest.raises(ValueError, match='at least 3'):
+        EquityHistory(app).query(end - timedelta(hours=1), end, points)
+
+def test_query_downsamples_raw_snapshots(app):
+    end = datetime.utcnow().replace(microsecond=0)
+    with app.app_context():
+        for i in range(100):
+            db.session.add(AccountSnapshot(timestamp=end - timedelta(seconds=i * 15), balance=1000.0,
+                                           nav=1000.0 + (i % 7), margin_used=0.0, unrealized_pnl=0.0))
+        db.session.commit()
+
+    result = EquityHistory(app).query(end - timedelta(hours=1), end, 10)
+    assert result['resolution'] == 'raw' and result['source_points'] == 100
+    assert len(result['points']) == 10
+    assert result['points'][0]['timestamp'] < result['points'][-1]['timestamp']
+
+def test_lttb_keeps_endpoints_and_peaks():
+    points = [(x, 10.0 if x == 50 else 0.0, x) for x in range(100)]
+    sampled = lttb(points, 5)
+    assert len(sampled) == 5
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert points[50] in sampled
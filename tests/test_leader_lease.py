@@ -0,0 +1,52 @@
+"""
+Leader lease: first acquisition, renewal, exclusion and takeover after expiry or release.
+"""
+
+from datetime import datetime, timedelta
+from models import db, LeaderLease
+from leader_lease import LeaderElector
+
+def lease(app):
+    with app.app_context():
+        row = db.session.get(LeaderLease, 'executor')
+        db.session.refresh(row)
+        return row.owner, row.expires_at
+
+def test_first_process_acquires_and_renews(app):
+    a = LeaderElector(app, ttl=30, owner='A')
+    assert a.try_acquire()
+    _, first_expiry = lease(app)
+
+    assert a.try_acquire()
+    owner, renewed_expiry = lease(app)
+    assert owner == 'A' and renewed_expiry >= first_expiry
+
+def test_live_lease_excludes_others(app):
+    a, b = LeaderElector(app, ttl=30, owner='A'), LeaderElector(app, ttl=30, owner='B')
+    assert a.try_acquire()
+    assert not b.try_acquire()
+    assert lease(app)[0] == 'A'
+
+def test_expired_lease_is_taken_over(app):
+    a, b = LeaderElector(app, ttl=30, owner='A'), LeaderElector(app, ttl=30, owner='B')
+    a.try_acquire()
+    with app.app_context():
+        db.session.get(LeaderLease, 'executor').expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    assert b.try_acquire()
+    assert lease(app)[0] == 'B'
+    assert not a.try_acquire()
+
+def test_release_hands_over_and_callbacks_fire(app):
+    events = []
+    a = LeaderElector(app, ttl=30, owner='A', on_elected=lambda: events.append('elected'),
+                      on_revoked=lambda: events.append('revoked'))
+    b = LeaderElector(app, ttl=30, owner='B')
+
+    a._set_leader(a.try_acquire())
+    assert a.is_leader
+    a.stop()
+
+    assert events == ['elected', 'revoked'] and not a.is_leader
+    assert b.try_acquire()
@@ -0,0 +1,125 @@
+"""
+Recovery of signals taken over after their order may already have reached OANDA.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from oandapyV20.exceptions import V20Error
+from models import db, Signal, Trade
+from oanda_trader import OANDATrader, OrderStatusUnknown
+from price_book import PriceBook
+from currency_conversion import CurrencyConverter
+from exposure_ledger import ExposureLedger
+from signal_claims import SignalClaimer, CLAIMED, SUBMITTED
+from request_scheduler import request_scheduler, ORDER
+
+class FakeClient:
+    """Answers OrderDetails/TransactionDetails by path; anything else (OrderCreate) is recorded and fails"""
+
+    def __init__(self, order=None, transaction=None):
+        self.order = order
+        self.transaction = transaction
+        self.requests = []
+
+    def request(self, r):
+        path = str(r)
+        self.requests.append(path)
+        if '/orders/@' in path:
+            if self.order is None:
+                raise V20Error(404, 'Order not found')
+            return {'order': self.order}
+        if '/transactions/' in path:
+            return {'transaction': self.transaction}
+        raise AssertionError(f"Unexpected request {path}")
+
+def make_trader(app, client):
+    trader = OANDATrader.__new__(OANDATrader)
+    trader.app = app
+    trader.client = client
+    trader.account_id = 'acct'
+    trader.price_book = PriceBook(None, 'acct')
+    trader.converter = CurrencyConverter(trader.price_book)
+    trader.exposure_ledger = ExposureLedger(trader.converter)
+    return trader
+
+def taken_over_signal():
+    """A SUBMITTED signal whose executor died, reclaimed by another one"""
+    signal = Signal(discord_message_id='sig_1', symbol='EUR_USD', action='BUY', raw_message='test')
+    db.session.add(signal)
+    db.session.commit()
+
+    SignalClaimer('A').claim_batch()
+    SignalClaimer('A').transition(signal.id, CLAIMED, SUBMITTED)
+    signal.claim_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    claimer = SignalClaimer('B')
+    assert claimer.claim_batch() == [signal.id]
+    assert claimer.claim(signal.id)
+    db.session.refresh(signal)
+    assert signal.status == SUBMITTED
+    return signal
+
+def test_recovery_does_not_resubmit_when_no_order_arrived(app):
+    with app.app_context():
+        signal = taken_over_signal()
+        client = FakeClient(order=None)
+
+        assert make_trader(app, client).recover_order(signal) is None
+        assert client.requests == [f"v3/accounts/acct/orders/@sig-{signal.id}"]
+
+def test_recovery_returns_fill_that_opened_no_trade(app):
+    with app.app_context():
+        signal = taken_over_signal()
+        client = FakeClient(
+            order={'state': 'FILLED', 'fillingTransactionID': '42'},
+            transaction={'type': 'ORDER_FILL', 'price': '1.1000', 'units': '1000', 'tradesClosed': [{'tradeID': '7'}]}
+        )
+
+        fill = make_trader(app, client).recover_order(signal)
+        assert fill == {'state': 'FILLED', 'trade_id': None, 'price': 1.1, 'units': 1000}
+        assert client.requests[-1] == 'v3/accounts/acct/transactions/42'
+
+def test_recovery_lookup_failure_leaves_outcome_unknown(app):
+    class BrokenClient(FakeClient):
+        def request(self, r):
+            raise V20Error(503, 'Service unavailable')
+
+    with app.app_context():
+        signal = taken_over_signal()
+        with pytest.raises(OrderStatusUnknown):
+            make_trader(app, BrokenClient()).recover_order(signal)
+
+def test_recovery_records_trade_opened_by_earlier_executor(app):
+    with app.app_context():
+        signal = taken_over_signal()
+        client = FakeClient(
+            order={'state': 'FILLED', 'fillingTransactionID': '42'},
+            transaction={'type': 'ORDER_FILL', 'price': '1.1000', 'units': '1000',
+                         'tradeOpened': {'tradeID': '99', 'units': '1000', 'price': '1.1002'}}
+        )
+        trader = make_trader(app, client)
+
+        trade = trader.recover_order(signal)
+        assert trade.oanda_trade_id == '99'
+        assert '99' in trader.exposure_ledger.trades
+
+        # Written through the persistence writer; a second recovery finds the same row
+        assert Trade.query.filter_by(signal_id=signal.id).count() == 1
+        assert trader.recover_order(signal).id == trade.id
+        assert Trade.query.filter_by(signal_id=signal.id).count() == 1
+
+def test_recovery_lookups_run_at_order_priority(app):
+    class PriorityClient(FakeClient):
+        def request(self, r):
+            self.priorities.append(request_scheduler.classify(r))
+            return super().request(r)
+
+    with app.app_context():
+        signal = taken_over_signal()
+        client = PriorityClient(order={'state': 'FILLED', 'fillingTransactionID': '42'},
+                                transaction={'type': 'ORDER_FILL', 'price': '1.1000', 'units': '1000'})
+        client.priorities = []
+
+        make_trader(app, client).recover_order(signal)
+        assert client.priorities == [ORDER, ORDER]  # OrderDetails and TransactionDetails would otherwise be SYNC
@@ -0,0 +1,49 @@
+"""
+Group commits through the persistence writer: batching, flush on stop and failure isolation.
+"""
+
+import pytest
+from models import db, Signal
+from persistence_writer import PersistenceWriter
+
+def make_signal(message_id):
+    return Signal(discord_message_id=message_id, symbol='EUR_USD', action='BUY', raw_message='test')
+
+def test_batch_commits_together_and_flushes_on_stop(app):
+    writer = PersistenceWriter(app, batch_size=10, window=0.2)
+    futures = [writer.add(make_signal(f"sig_{i}")) for i in range(5)]
+    writer.stop()
+
+    assert all(future.result(timeout=5).id for future in futures)
+    stats = writer.get_stats()
+    assert stats['mutations'] == 5 and stats['batches'] < 5 and stats['failures'] == 0
+    with app.app_context():
+        assert Signal.query.count() == 5
+
+def test_failed_mutation_does_not_sink_the_rest_of_its_batch(app):
+    writer = PersistenceWriter(app, batch_size=10, window=0.2)
+    first = make_signal('sig_1')
+    futures = [writer.add(first), writer.add(make_signal('sig_1')), writer.add(make_signal('sig_2'))]
+    writer.stop()
+
+    assert futures[0].result(timeout=5).id
+    with pytest.raises(Exception):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5).id
+    assert writer.get_stats()['failures'] == 1
+
+    with app.app_context():
+        assert sorted(s.discord_message_id for s in Signal.query) == ['sig_1', 'sig_2']
+        # The replayed rows got fresh keys rather than the ones the rolled-back batch assigned
+        assert len({future.result().id for future in (futures[0], futures[2])}) == 2
+
+def test_func_exception_reaches_its_caller(app):
+    writer = PersistenceWriter(app)
+
+    def broken(session):
+        raise ValueError('bad mutation')
+
+    future = writer.submit(broken)
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    writer.stop()
@@ -0,0 +1,75 @@
+"""
+Signal claim state machine: claiming, takeover of expired leases, and expiry.
+"""
+
+from datetime import datetime, timedelta
+from models import db, Signal
+from signal_claims import SignalClaimer, CLAIMED, SUBMITTED, FILLED, EXPIRED
+
+def add_signal(message_id='sig_1', **values):
+    signal = Signal(discord_message_id=message_id, symbol='EUR_USD', action='BUY', raw_message='test', **values)
+    db.session.add(signal)
+    db.session.commit()
+    return signal.id
+
+def expire_lease(signal_id):
+    db.session.get(Signal, signal_id).claim_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+def test_only_one_executor_claims_a_signal(app):
+    with app.app_context():
+        signal_id = add_signal()
+        a, b = SignalClaimer('A'), SignalClaimer('B')
+
+        assert a.claim_batch() == [signal_id]
+        assert b.claim_batch() == []
+        assert not b.claim(signal_id)
+        assert a.claim(signal_id)  # Re-claiming our own live claim succeeds
+
+def test_takeover_keeps_submitted_and_new_owner_can_claim(app):
+    with app.app_context():
+        signal_id = add_signal()
+        a, b = SignalClaimer('A'), SignalClaimer('B')
+        a.claim_batch()
+        assert a.transition(signal_id, CLAIMED, SUBMITTED)
+
+        expire_lease(signal_id)
+        assert b.claim_batch() == [signal_id]
+
+        signal = db.session.get(Signal, signal_id)
+        db.session.refresh(signal)
+        assert (signal.status, signal.claim_owner) == (SUBMITTED, 'B')
+
+        # execute_signal claims again before acting on the row it was handed
+        assert b.claim(signal_id)
+        assert not a.transition(signal_id, SUBMITTED, FILLED)
+        assert b.transition(signal_id, SUBMITTED, FILLED)
+
+def test_expire_only_touches_unsubmitted_claims(app):
+    with app.app_context():
+        claimed_id = add_signal('sig_1')
+        submitted_id = add_signal('sig_2')
+        claimer = SignalClaimer('A')
+        claimer.claim_batch()
+        claimer.transition(submitted_id, CLAIMED, SUBMITTED)
+
+        assert claimer.expire([claimed_id, submitted_id]) == 1
+        db.session.expire_all()
+        assert db.session.get(Signal, claimed_id).status == EXPIRED
+        assert db.session.get(Signal, submitted_id).status == SUBMITTED
+
+def test_expire_stale_skips_submitted_and_fresh_signals(app):
+    with app.app_context():
+        old = datetime.utcnow() - timedelta(hours=1)
+        stale_id = add_signal('sig_1', timestamp=old)
+        fresh_id = add_signal('sig_2')
+        submitted_id = add_signal('sig_3', timestamp=old)
+        claimer = SignalClaimer('A')
+        claimer.claim(submitted_id)
+        claimer.transition(submitted_id, CLAIMED, SUBMITTED)
+        expire_lease(submitted_id)
+
+        cutoff = datetime.utcnow() - timedelta(minutes=5)
+        assert claimer.expire_stale({}, cutoff) == 1
+        db.session.expire_all()
+        assert [db.session.get(Signal, i).status for i in (stale_id, fresh_id, submitted_id)] == ['EXPIRED', 'NEW', SUBMITTED]
@@ -0,0 +1,38 @@
+"""
+Signal TTLs per source and drift from the entry price.
+"""
+
+from datetime import datetime, timedelta
+from models import db, Signal
+from config import Config
+from signal_claims import SignalClaimer, NEW, EXPIRED
+from signal_freshness import expiry_cutoffs, is_expired, is_drifted
+
+def test_ttl_follows_source_not_strategy():
+    # discord_signal_processor writes manual signals under the Discord strategy name
+    signal = Signal(discord_message_id='manual_1', source='MANUAL', strategy='DISCORD_SIGNAL',
+                    timestamp=datetime.utcnow() - timedelta(seconds=Config.SIGNAL_TTL_SECONDS['DISCORD'] + 1))
+    assert not is_expired(signal)
+
+    signal.timestamp = datetime.utcnow() - timedelta(seconds=Config.SIGNAL_TTL_SECONDS['MANUAL'] + 1)
+    assert is_expired(signal)
+
+def test_expire_stale_uses_each_source_cutoff(app):
+    age = datetime.utcnow() - timedelta(seconds=Config.SIGNAL_TTL_SECONDS['DISCORD'] + 1)
+    with app.app_context():
+        for message_id in ('123456', 'manual_1'):
+            db.session.add(Signal(discord_message_id=message_id, symbol='EUR_USD', action='BUY',
+                                  raw_message='test', strategy='DISCORD_SIGNAL', timestamp=age))
+        db.session.commit()
+
+        cutoffs, default_cutoff = expiry_cutoffs()
+        assert SignalClaimer('A').expire_stale(cutoffs, default_cutoff) == 1
+        assert {s.source: s.status for s in Signal.query} == {'DISCORD': EXPIRED, 'MANUAL': NEW}
+
+def test_drift_measured_in_pips_from_entry():
+    signal = Signal(symbol='EUR_USD', entry_price=1.1000)
+    limit = Config.MAX_SLIPPAGE_PIPS * 0.0001
+
+    assert not is_drifted(signal, {'mid': 1.1000 + limit * 0.5})
+    assert is_drifted(signal, {'mid': 1.1000 - limit * 1.5})
+    assert not is_drifted(signal, None)  # Unknown price is not evidence of drift
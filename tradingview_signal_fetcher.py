@@ -16,7 +16,11 @@ from flask import request
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from models import db, Signal
+from config import Config
 from config_manager import TradingViewConfigManager
+from instrument_registry import instrument_registry
+from signal_bus import signal_bus
+from persistence_writer import persistence_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,14 +57,16 @@ class TradingViewSignalFetcher:
                     take_profit=signal_data.get('take_profit'),
                     lot_size=signal_data.get('lot_size', 0.01),
                     strategy='TRADINGVIEW_SIGNAL',
+                    source='TRADINGVIEW',
                     confidence=signal_data.get('confidence', 100.0),
                     raw_message=json.dumps(webhook_data),
                     processed=False,
                     timestamp=datetime.utcnow()
                 )
                 
-                db.session.add(signal)
-                db.session.commit()
+                # The webhook answers with the signal ID, so wait for its group commit
+                signal = persistence_writer.add(signal).result(timeout=Config.PERSISTENCE_TIMEOUT)
+                signal_bus.publish(signal.id)
                 
                 logger.info(f"TradingView signal processed: {signal.action} {signal.symbol} @ {signal.entry_price}")
                 return signal
@@ -109,7 +115,7 @@ class TradingViewSignalFetcher:
                 return None
             
             # Normalize symbol format
-            symbol = symbol.upper().replace('/', '_')
+            symbol = instrument_registry.resolve(symbol) or symbol.upper().replace('/', '_')
             
             # Convert prices to float
             try:
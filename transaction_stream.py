@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Transaction Stream Listener
+This module applies OANDA account transactions (SL/TP fills, trade closes) to the Trade table as they happen.
+"""
+
+import threading
+import logging
+from datetime import datetime
+import oandapyV20.endpoints.trades as trades
+import oandapyV20.endpoints.transactions as transactions
+from models import db, Trade
+
+logger = logging.getLogger(__name__)
+
+def parse_oanda_time(value):
+    """Parse an OANDA RFC3339 timestamp (nanosecond precision) into a naive UTC datetime"""
+    try:
+        date_part, _, fraction = value.rstrip('Z').partition('.')
+        parsed = datetime.strptime(date_part, '%Y-%m-%dT%H:%M:%S')
+        if fraction:
+            parsed = parsed.replace(microsecond=int(fraction[:6].ljust(6, '0')))
+        return parsed
+    except Exception:
+        return datetime.utcnow()
+
+class TransactionStreamListener:
+    """Background consumer of the v20 TransactionsStream"""
+
+    def __init__(self, app, client, account_id, stream_client=None, exposure_ledger=None):
+        self.app = app
+        self.client = client
+        self.stream_client = stream_client or client
+        self.account_id = account_id
+        self.exposure_ledger = exposure_ledger
+        self.last_transaction_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the listener thread"""
+        self._stop.clear()  # Also cancels a stop still waiting for the next message
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='transaction-stream', daemon=True)
+        self._thread.start()
+        logger.info("Transaction stream listener started")
+
+    def stop(self):
+        """Stop the listener after its next message"""
+        self._stop.set()
+
+    def apply_transaction(self, transaction):
+        """
+        Apply a single transaction to the Trade table.
+
+        Args:
+            transaction (dict): OANDA transaction
+
+        Returns:
+            int: Number of trade rows changed
+        """
+        if transaction.get('type') != 'ORDER_FILL':
+            return 0
+
+        reason = transaction.get('reason')
+        close_time = parse_oanda_time(transaction.get('time', ''))
+        changed = 0
+
+        if self.exposure_ledger:
+            self._apply_exposure(transaction)
+
+        with self.app.app_context():
+            for closed in transaction.get('tradesClosed', []):
+                trade = Trade.query.filter_by(oanda_trade_id=closed['tradeID']).first()
+                if not trade or trade.status == 'CLOSED':
+                    continue
+
+                trade.status = 'CLOSED'
+                trade.close_timestamp = close_time
+                trade.close_price = float(closed.get('price', transaction.get('price', 0)))
+                trade.pnl = float(closed.get('realizedPL', 0))
+                changed += 1
+                logger.info(f"Trade {closed['tradeID']} closed by {reason} @ {trade.close_price} (P&L {trade.pnl})")
+
+            reduced = transaction.get('tradeReduced')
+            if reduced:
+                trade = Trade.query.filter_by(oanda_trade_id=reduced['tradeID']).first()
+                if trade and trade.status == 'OPEN':
+                    trade.units += int(float(reduced['units']))
+                    changed += 1
+                    logger.info(f"Trade {reduced['tradeID']} reduced by {reduced['units']} units ({reason})")
+
+            if changed:
+                db.session.commit()
+
+        return changed
+
+    def _apply_exposure(self, transaction):
+        instrument = transaction.get('instrument')
+        for closed in transaction.get('tradesClosed', []):
+            self.exposure_ledger.close(closed['tradeID'])
+        reduced = transaction.get('tradeReduced')
+        if reduced:
+            self.exposure_ledger.reduce(reduced['tradeID'], float(reduced['units']))
+        opened = transaction.get('tradeOpened')
+        if opened and instrument:
+            self.exposure_ledger.open(opened['tradeID'], instrument, float(opened['units']),
+                                      float(opened.get('price', transaction.get('price', 0))))
+
+    def reconcile_open_trades(self):
+        """Close Trade rows that OANDA no longer reports as open (missed while disconnected)"""
+        try:
+            r = trades.OpenTrades(accountID=self.account_id)
+            response = self.client.request(r)
+            open_ids = {trade_data['id'] for trade_data in response['trades']}
+            self.last_transaction_id = response.get('lastTransactionID', self.last_transaction_id)
+        except Exception as e:
+            logger.error(f"Error reconciling open trades: {e}")
+            return
+
+        with self.app.app_context():
+            try:
+                stale_trades = [
+                    trade for trade in Trade.query.filter_by(status='OPEN').all()
+                    if trade.oanda_trade_id not in open_ids
+                ]
+
+                reconciled = 0
+                for trade in stale_trades:
+                    # One unreadable trade must not hold back the rest
+                    try:
+                        r = trades.TradeDetails(accountID=self.account_id, tradeID=trade.oanda_trade_id)
+                        trade_data = self.client.request(r)['trade']
+                        if trade_data.get('state') != 'CLOSED':
+                            continue
+
+                        # Parse everything before touching the row so a bad field leaves it unchanged
+                        close_timestamp = parse_oanda_time(trade_data.get('closeTime', ''))
+                        close_price = float(trade_data.get('averageClosePrice', 0))
+                        pnl = float(trade_data.get('realizedPL', 0))
+                    except Exception as e:
+                        logger.warning(f"Could not reconcile trade {trade.oanda_trade_id}: {e}")
+                        continue
+
+                    trade.status = 'CLOSED'
+                    trade.close_timestamp = close_timestamp
+                    trade.close_price = close_price
+                    trade.pnl = pnl
+                    reconciled += 1
+
+                db.session.commit()
+
+                if reconciled:
+                    logger.info(f"Reconciled {reconciled} trades closed on OANDA")
+
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error reconciling open trades: {e}")
+
+    def _run(self):
+        """Consume the transaction stream, reconciling and reconnecting on errors"""
+        backoff = 1
+
+        while not self._stop.is_set():
+            # Pick up anything that closed while we were not listening
+            self.reconcile_open_trades()
+
+            try:
+                r = transactions.TransactionsStream(accountID=self.account_id)
+
+                for msg in self.stream_client.request(r):
+                    if msg.get('type') == 'HEARTBEAT':
+                        self.last_transaction_id = msg.get('lastTransactionID', self.last_transaction_id)
+                    else:
+                        self.apply_transaction(msg)
+                        self.last_transaction_id = msg.get('id', self.last_transaction_id)
+
+                    backoff = 1
+
+                    if self._stop.is_set():
+                        r.terminate("stopped")
+
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.error(f"Transaction stream error, reconnecting in {backoff}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
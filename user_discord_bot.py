@@ -15,9 +15,11 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
-from models import Signal, db
+from models import Signal
 from config import Config
+from instrument_registry import instrument_registry
 from user_token_manager import UserTokenManager
+from persistence_writer import persistence_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -128,13 +130,14 @@ class UserDiscordBot:
                         take_profit=signal_data.get('take_profit'),
                         lot_size=signal_data.get('lot_size', Config.DEFAULT_LOT_SIZE),
                         strategy='DISCORD_SIGNAL',
+                        source='DISCORD',
                         raw_message=message.content,
                         processed=False,
                         timestamp=datetime.utcnow()
                     )
                     
-                    db.session.add(signal)
-                    db.session.commit()
+                    # Group-committed by the writer thread so the event loop never waits on an fsync
+                    persistence_writer.add(signal)
                     
                     logger.info(f'New signal received: {signal.action} {signal.symbol} @ {signal.entry_price}')
                     print(f'📡 New Signal: {signal.action} {signal.symbol} @ {signal.entry_price}')
@@ -166,21 +169,8 @@ class UserDiscordBot:
             if not action:
                 return None
             
-            # Extract symbol (common forex pairs)
-            symbols = [
-                'EUR_USD', 'GBP_USD', 'USD_JPY', 'AUD_USD', 'USD_CAD',
-                'NZD_USD', 'USD_CHF', 'EUR_GBP', 'EUR_JPY', 'GBP_JPY',
-                'AUD_JPY', 'CAD_JPY', 'CHF_JPY', 'EUR_AUD', 'EUR_CAD',
-                'EUR_CHF', 'EUR_NZD', 'GBP_AUD', 'GBP_CAD', 'GBP_CHF',
-                'GBP_NZD', 'AUD_CAD', 'AUD_CHF', 'AUD_NZD', 'CAD_CHF',
-                'CAD_NZD', 'CHF_NZD', 'NZD_JPY'
-            ]
-            
-            symbol = None
-            for s in symbols:
-                if s in content:
-                    symbol = s
-                    break
+            # Extract symbol
+            symbol = instrument_registry.find_in_text(content)
             
             if not symbol:
                 return None
@@ -233,7 +223,7 @@ async def start_user_bot():
     
     try:
         # Create Flask app
-        app = create_app()
+        app = create_app(start_executor=False)
         
         # Create user bot
         user_bot = UserDiscordBot(app)
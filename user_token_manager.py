@@ -8,6 +8,7 @@ import logging
 from datetime import datetime
 from models import db, UserToken
 from token_encryption import token_encryption
+from persistence_writer import persistence_writer
 
 logger = logging.getLogger(__name__)
 
@@ -102,9 +103,9 @@ class UserTokenManager:
                 logger.error(f"Failed to decrypt token for user {user_id}")
                 return None
             
-            # Update last used timestamp
-            token_obj.last_used = datetime.utcnow()
-            db.session.commit()
+            # Bump last used in the background; reading a token needs no commit of its own
+            last_used = datetime.utcnow()
+            persistence_writer.submit(UserTokenManager._touch_last_used, token_obj.id, last_used)
             
             return {
                 'user_id': token_obj.user_id,
@@ -113,7 +114,7 @@ class UserTokenManager:
                 'channel_id': token_obj.channel_id,
                 'channel_name': token_obj.channel_name,
                 'is_active': token_obj.is_active,
-                'last_used': token_obj.last_used,
+                'last_used': last_used,
                 'created_at': token_obj.created_at,
                 'updated_at': token_obj.updated_at
             }
@@ -122,6 +123,10 @@ class UserTokenManager:
             logger.error(f"Error getting user token: {e}")
             return None
     
+    @staticmethod
+    def _touch_last_used(session, token_id, last_used):
+        session.query(UserToken).filter_by(id=token_id).update({'last_used': last_used}, synchronize_session=False)
+    
     @staticmethod
     def get_active_tokens():
         """
@@ -245,9 +250,9 @@ class UserTokenManager:
                 logger.error(f"Failed to decrypt token for device {device_fingerprint} or IP {ip_address}")
                 return None
             
-            # Update last used timestamp
-            token_obj.last_used = datetime.utcnow()
-            db.session.commit()
+            # Bump last used in the background; reading a token needs no commit of its own
+            last_used = datetime.utcnow()
+            persistence_writer.submit(UserTokenManager._touch_last_used, token_obj.id, last_used)
             
             return {
                 'user_id': token_obj.user_id,
@@ -259,7 +264,7 @@ class UserTokenManager:
                 'device_fingerprint': token_obj.device_fingerprint,
                 'ip_address': token_obj.ip_address,
                 'user_agent': token_obj.user_agent,
-                'last_used': token_obj.last_used,
+                'last_used': last_used,
                 'created_at': token_obj.created_at,
                 'updated_at': token_obj.updated_at
             }
@@ -13,7 +13,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
-from models import Signal, TradingSettings
+from models import Signal, TradingSettings, EXTERNAL_SIGNAL_SOURCES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,7 +25,7 @@ def main():
     
     try:
         # Create Flask app
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             # Check auto trading status
@@ -37,7 +37,7 @@ def main():
             
             # Get all unprocessed Discord signals
             pending_signals = Signal.query.filter(
-                Signal.discord_message_id.notlike('strategy_%'),
+                Signal.source.in_(EXTERNAL_SIGNAL_SOURCES),
                 Signal.processed == False
             ).order_by(Signal.timestamp.desc()).all()
             
@@ -59,9 +59,9 @@ def main():
                 print()
             
             # Show total signals
-            total_discord_signals = Signal.query.filter(Signal.discord_message_id.notlike('strategy_%')).count()
+            total_discord_signals = Signal.query.filter(Signal.source.in_(EXTERNAL_SIGNAL_SOURCES)).count()
             processed_discord_signals = Signal.query.filter(
-                Signal.discord_message_id.notlike('strategy_%'),
+                Signal.source.in_(EXTERNAL_SIGNAL_SOURCES),
                 Signal.processed == True
             ).count()
             
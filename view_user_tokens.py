@@ -27,7 +27,7 @@ def main():
     
     try:
         # Create Flask app context
-        app = create_app()
+        app = create_app(start_executor=False)
         
         with app.app_context():
             tokens = UserTokenManager.get_active_tokens()